@@ -0,0 +1,571 @@
+# Main Objective:     Benchmark the scraping and migration pipeline offline.
+#                     A fake YouTube Data API serves synthetic channels of configurable size,
+#                     MongoDB and MySQL are the local servers used by the app.
+
+# Usage:              python Benchmark_Harvesting.py --channels 2 --videos 1000 --comments 20 --scenario all
+
+
+import argparse
+import gc
+import hashlib
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+logging.disable(logging.WARNING)  # Streamlit warns on every st.* call outside "streamlit run"
+
+import YouTube_Data_Harvesting as Harvesting
+
+
+#___________________________Fake YouTube Data API___________________________#
+def Parse_Fields(Fields):
+    """
+    Parse a partial-response fields parameter (e.g. items(id,snippet/title),nextPageToken).
+
+    Returns:
+    - Nested dictionary of selected field -> sub-selection (None selects the whole field)
+    """
+    Position = 0
+
+    def Parse_List():
+        nonlocal Position
+        Selection = {}
+        while Position < len(Fields):
+            Start = Position
+            while Position < len(Fields) and Fields[Position] not in ',()':
+                Position += 1
+            Path = Fields[Start:Position].split('/')
+            Sub_Selection = None
+            if Position < len(Fields) and Fields[Position] == '(':
+                Position += 1
+                Sub_Selection = Parse_List()
+            Node = Selection
+            for name in Path[:-1]:
+                Node = Node.setdefault(name, {})
+            Node[Path[-1]] = Sub_Selection
+            if Position < len(Fields) and Fields[Position] == ')':
+                Position += 1
+                return Selection
+            Position += 1  # skip ','
+        return Selection
+
+    return Parse_List()
+
+
+def Apply_Fields(Value, Selection):
+    if Selection is None:
+        return Value
+    if isinstance(Value, list):
+        return [Apply_Fields(item, Selection) for item in Value]
+    if isinstance(Value, dict):
+        return {key: Apply_Fields(Value[key], Selection[key]) for key in Selection if key in Value}
+    return Value
+
+
+class FakeRequest:
+    """
+    Stand-in for googleapiclient's HttpRequest: execute() serializes the synthetic response
+    (restricted to the requested parts and fields) and parses it through postproc like the real client,
+    or raises 304 Not Modified when If-None-Match carries the ETag of the response.
+
+    """
+    def __init__(self, Handler, Endpoint, Params):
+        self.Handler = Handler
+        self.Endpoint = Endpoint
+        self.Params = Params
+        self.headers = {}
+        self.uri = Endpoint + '?' + '&'.join(f'{key}={value}' for key, value in sorted(Params.items()) if value is not None)
+        self.postproc = lambda resp, content: json.loads(content)
+
+    def execute(self):
+        Response = self.Handler(self.Params)
+        if self.headers.get('If-None-Match') == Response['etag']:
+            raise HttpError(httplib2.Response({'status': 304}), b'', uri=self.uri)
+        Parts = set(self.Params.get('part', '').split(',')) | {'id', 'kind', 'etag'}
+        Response['items'] = [{key: value for key, value in item.items() if key in Parts} for item in Response['items']]
+        if self.Params.get('fields'):
+            Response = Apply_Fields(Response, Parse_Fields(self.Params['fields']))
+        return self.postproc(httplib2.Response({'status': 200}), json.dumps(Response).encode())
+
+
+class FakeResource:
+    def __init__(self, Api, Endpoint):
+        self.Api = Api
+        self.Endpoint = Endpoint
+
+    def list(self, **Params):
+        return FakeRequest(getattr(self.Api, 'List_' + self.Endpoint), self.Endpoint, Params)
+
+
+class FakeYouTube:
+    """
+    Fake YouTube Data API v3 client serving paginated channels, playlistItems, videos, playlists
+    and commentThreads responses for synthetic channels. The data is generated on demand from the
+    ids, so channels with 100k videos do not have to be held in memory.
+
+    """
+    def __init__(self, Channels=1, Videos_Per_Channel=100, Comments_Per_Video=10, Playlists_Per_Channel=5, Latency=0.0):
+        self.Channel_Ids = [f'UCbench{index:017d}' for index in range(Channels)]
+        self.Videos_Per_Channel = Videos_Per_Channel
+        self.Comments_Per_Video = Comments_Per_Video
+        self.Playlists_Per_Channel = Playlists_Per_Channel
+        self.Latency = Latency
+        self.Calls = {}
+        self.Epoch = datetime(2020, 1, 1)
+
+    def __getattr__(self, Endpoint):
+        if Endpoint in ('channels', 'playlistItems', 'videos', 'playlists', 'commentThreads'):
+            return lambda: FakeResource(self, Endpoint)
+        raise AttributeError(Endpoint)
+
+    def Respond(self, Endpoint, Items, Start=0, Page_Size=None, Total=None):
+        self.Calls[Endpoint] = self.Calls.get(Endpoint, 0) + 1
+        if self.Latency:
+            time.sleep(self.Latency)
+        Etag = hashlib.md5(json.dumps(Items, sort_keys=True).encode()).hexdigest()
+        Response = {'kind': f'youtube#{Endpoint}ListResponse', 'etag': Etag, 'items': Items}
+        if Page_Size and Start + Page_Size < Total:
+            Response['nextPageToken'] = str(Start + Page_Size)
+        return Response
+
+    def Thumbnails(self, Name):
+        # The real API returns every thumbnail size, the scraping only reads the default one
+        return {size: {'url': f'https://example.com/{Name}/{size}.jpg', 'width': width, 'height': height}
+                for size, width, height in (('default', 120, 90), ('medium', 320, 180), ('high', 480, 360),
+                                            ('standard', 640, 480), ('maxres', 1280, 720))}
+
+    def Timestamp(self, Seconds):
+        return (self.Epoch + timedelta(seconds=Seconds)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    def List_channels(self, Params):
+        # Synthetic channel N also answers to the handle @benchchannelN and the username benchchannelN
+        Names = {f'benchchannel{index}': channel_id for index, channel_id in enumerate(self.Channel_Ids)}
+        if 'forHandle' in Params:
+            Channel_Ids = [Names.get(Params['forHandle'].lstrip('@'))]
+        elif 'forUsername' in Params:
+            Channel_Ids = [Names.get(Params['forUsername'])]
+        else:
+            Channel_Ids = Params['id'].split(',')
+
+        Items = []
+        for channel_id in Channel_Ids:
+            if channel_id not in self.Channel_Ids:
+                continue
+            Items.append({
+                'id': channel_id,
+                'snippet': {'title': f'Benchmark Channel {channel_id[-4:]}',
+                            'description': 'Synthetic channel used by Benchmark_Harvesting.py',
+                            'customUrl': '@benchchannel', 'publishedAt': self.Timestamp(0),
+                            'thumbnails': self.Thumbnails(channel_id),
+                            'localized': {'title': f'Benchmark Channel {channel_id[-4:]}',
+                                          'description': 'Synthetic channel used by Benchmark_Harvesting.py'}},
+                'contentDetails': {'relatedPlaylists': {'likes': '', 'uploads': 'UU' + channel_id[2:]}},
+                'statistics': {'subscriberCount': '1000', 'viewCount': str(1000 * self.Videos_Per_Channel),
+                               'hiddenSubscriberCount': False, 'videoCount': str(self.Videos_Per_Channel)}
+            })
+        return self.Respond('channels', Items)
+
+    def List_playlistItems(self, Params):
+        channel_id = 'UC' + Params['playlistId'][2:]
+        Start = int(Params.get('pageToken') or 0)
+        Page_Size = Params.get('maxResults', 5)
+        Items = [{'snippet': {'title': f'Benchmark Video {index}', 'description': 'Synthetic video description ' * 20,
+                              'publishedAt': self.Timestamp(index * 86400), 'channelId': channel_id,
+                              'thumbnails': self.Thumbnails(f'{channel_id}-v{index:06d}'), 'position': index,
+                              'resourceId': {'kind': 'youtube#video', 'videoId': f'{channel_id}-v{index:06d}'}},
+                  'contentDetails': {'videoId': f'{channel_id}-v{index:06d}', 'videoPublishedAt': self.Timestamp(index * 86400)}}
+                 for index in range(Start, min(Start + Page_Size, self.Videos_Per_Channel))]
+        return self.Respond('playlistItems', Items, Start, Page_Size, self.Videos_Per_Channel)
+
+    def List_videos(self, Params):
+        Items = []
+        for video_id in Params['id'].split(','):
+            channel_id, index = video_id.rsplit('-v', 1)
+            index = int(index)
+            Items.append({
+                'id': video_id,
+                'snippet': {'channelId': channel_id, 'title': f'Benchmark Video {index}',
+                            'description': 'Synthetic video description ' * 20,
+                            'tags': ['benchmark', 'synthetic'], 'publishedAt': self.Timestamp(index * 86400),
+                            'thumbnails': self.Thumbnails(video_id), 'channelTitle': 'Benchmark Channel',
+                            'categoryId': '22', 'liveBroadcastContent': 'none', 'defaultAudioLanguage': 'en',
+                            'localized': {'title': f'Benchmark Video {index}', 'description': 'Synthetic video description ' * 20}},
+                'contentDetails': {'duration': f'PT{index % 3}H{index % 60}M{index % 59}S', 'dimension': '2d',
+                                   'definition': 'hd', 'caption': 'false', 'licensedContent': True,
+                                   'contentRating': {}, 'projection': 'rectangular'},
+                'statistics': {'viewCount': str(index * 10), 'likeCount': str(index), 'favoriteCount': '0',
+                               'commentCount': str(self.Comments_Per_Video)}
+            })
+        return self.Respond('videos', Items)
+
+    def List_playlists(self, Params):
+        Start = int(Params.get('pageToken') or 0)
+        Page_Size = Params.get('maxResults', 5)
+        Items = [{'id': f"PL{Params['channelId'][2:]}{index:04d}",
+                  'snippet': {'title': f'Benchmark Playlist {index}', 'description': 'Synthetic playlist'},
+                  'contentDetails': {'itemCount': self.Videos_Per_Channel}, 'status': {'privacyStatus': 'public'}}
+                 for index in range(Start, min(Start + Page_Size, self.Playlists_Per_Channel))]
+        return self.Respond('playlists', Items, Start, Page_Size, self.Playlists_Per_Channel)
+
+    def List_commentThreads(self, Params):
+        video_id = Params['videoId']
+        Start = int(Params.get('pageToken') or 0)
+        Page_Size = Params.get('maxResults', 20)
+        Items = [{'snippet': {'topLevelComment': {
+                    'id': f'{video_id}-c{index:05d}',
+                    'snippet': {'channelId': video_id.rsplit('-v', 1)[0], 'videoId': video_id,
+                                'textDisplay': f'Synthetic comment {index}', 'textOriginal': f'Synthetic comment {index}',
+                                'authorDisplayName': f'Author {index}',
+                                'authorProfileImageUrl': f'https://example.com/author{index}.jpg',
+                                'authorChannelUrl': f'https://www.youtube.com/@author{index}',
+                                'authorChannelId': {'value': f'UCauthor{index:016d}'}, 'canRate': True,
+                                'viewerRating': 'none', 'likeCount': index % 7,
+                                'publishedAt': self.Timestamp(index * 60), 'updatedAt': self.Timestamp(index * 60)}},
+                    'canReply': True, 'totalReplyCount': 0, 'isPublic': True, 'videoId': video_id}}
+                 for index in range(Start, min(Start + Page_Size, self.Comments_Per_Video))]
+        return self.Respond('commentThreads', Items, Start, Page_Size, self.Comments_Per_Video)
+
+
+class FakeKeyClient:
+    """
+    Client of one API key on the fake API: answers 403 quotaExceeded once the key has used
+    its quota, shared by the clients of the key in every thread.
+
+    """
+    def __init__(self, Api, API_Key, Used, Quota):
+        self.Api = Api
+        self.API_Key = API_Key
+        self.Used = Used
+        self.Quota = Quota
+
+    def __getattr__(self, Endpoint):
+        Resource = getattr(self.Api, Endpoint)
+        return lambda: FakeKeyResource(self, Resource())
+
+
+class FakeKeyResource:
+    def __init__(self, Client, Resource):
+        self.Client = Client
+        self.Resource = Resource
+
+    def list(self, **Params):
+        Request = self.Resource.list(**Params)
+        Execute = Request.execute
+
+        def Execute_With_Quota():
+            Client = self.Client
+            Client.Used[Client.API_Key] = Client.Used.get(Client.API_Key, 0) + 1
+            if Client.Quota and Client.Used[Client.API_Key] > Client.Quota:
+                Body = {'error': {'code': 403, 'errors': [{'reason': 'quotaExceeded'}]}}
+                raise HttpError(httplib2.Response({'status': 403}), json.dumps(Body).encode(), uri=Request.uri)
+            return Execute()
+        Request.execute = Execute_With_Quota
+        return Request
+
+
+def Fake_Key_Pool(Youtube, Keys, Quota):
+    """
+    Returns:
+    - API_Key_Pool of Keys fake keys on the fake API, each allowed Quota calls (0 for no limit)
+    """
+    Used = {}
+    return Harvesting.API_Key_Pool([f'benchmark-key-{index}' for index in range(Keys)], Daily_Quota=Quota or None,
+                                   Client_Factory=lambda API_Key: FakeKeyClient(Youtube, API_Key, Used, Quota))
+
+
+#___________________________Benchmark Scenarios___________________________#
+# Harvest run holding the synthetic channels in the Temporary DB, apart from the runs scraped in the app
+Run_Id = 'benchmark'
+
+
+def Peak_RSS_MB():
+    """
+    Peak resident set size of the benchmark process so far (Linux reports ru_maxrss in KB).
+    It never goes down, so each scenario of a multi-scenario benchmark runs in its own process.
+
+    """
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def Run_Scenario(Name, Function, Videos, Comments):
+    """
+    Time one scenario and collect its throughput, peak RSS and API call counts.
+
+    Returns:
+    - Result of the scenario
+    """
+    Start_RSS = Peak_RSS_MB()
+    Harvesting.Start_Run('benchmark_' + Name)
+    Start = time.perf_counter()
+    try:
+        Function()
+    finally:
+        Seconds = time.perf_counter() - Start
+        Report = Harvesting.Finish_Run()
+
+    Api_Calls = {item['Labels']['endpoint']: int(item['Value']) for item in Report['Counters']
+                 if item['Metric'] == 'youtube_api_calls_total'}
+    return {
+        'Scenario': Name,
+        'Seconds': round(Seconds, 3),
+        'Videos_Per_Second': round(Videos / Seconds, 1) if Seconds else None,
+        'Comments_Per_Second': round(Comments / Seconds, 1) if Seconds else None,
+        'Start_RSS_MB': Start_RSS,
+        'Peak_RSS_MB': Peak_RSS_MB(),
+        'API_Calls': Api_Calls,
+        'Quota_Units': int(sum(item['Value'] for item in Report['Counters']
+                               if item['Metric'] == 'youtube_api_quota_units_total')),
+        'Cache_Hit_Rate': Report.get('Cache_Hit_Rate', {}),
+        'Decoded_Response_Bytes': {item['Labels']['endpoint']: int(item['Value']) for item in Report['Counters']
+                                   if item['Metric'] == 'youtube_api_decoded_bytes_total'},
+        'Parse_Seconds': {item['Labels']['endpoint']: item['Total_Seconds'] for item in Report['Timers']
+                          if item['Metric'] == 'youtube_api_parse_seconds'},
+        'Key_Quota_Units': {item['Labels']['key']: int(item['Value']) for item in Report['Counters']
+                            if item['Metric'] == 'youtube_api_key_quota_units_total'}
+    }
+
+
+def Measure_Home_Page():
+    """
+    Run the Home page through Streamlit's script runner (AppTest) in a fresh interpreter, touch every
+    module like the source watcher of "streamlit run" does, and list the heavy libraries loaded by then.
+
+    Returns:
+    - (Seconds of the first Home page run, heavy libraries imported)
+    """
+    Script = (
+        "import json, logging, sys, time; logging.disable(logging.WARNING); "
+        "from streamlit.testing.v1 import AppTest; Start = time.perf_counter(); "
+        "App = AppTest.from_file(sys.argv[1], default_timeout=60).run(); Seconds = time.perf_counter() - Start; "
+        "[hasattr(module, '__file__') for module in list(sys.modules.values())]; "
+        "print(json.dumps([Seconds, [name for name in sys.argv[2:] if name in sys.modules]]))"
+    )
+    App_Path = os.path.abspath(Harvesting.__file__)
+    Output = subprocess.run([sys.executable, '-c', Script, App_Path, 'pandas', 'plotly.express', 'pyarrow',
+                             'pymongo', 'googleapiclient.discovery', 'mysql.connector'],
+                            capture_output=True, text=True, check=True, cwd=os.path.dirname(App_Path)).stdout
+    return json.loads(Output.strip().splitlines()[-1])
+
+
+def Measure_Startup():
+    """
+    Cold import time of the app module in a fresh interpreter (the heavy libraries are imported by the
+    functions and pages using them), time of the first API client build (reading the discovery document) and of the next one,
+    and the first run of the Home page with the libraries it loads.
+
+    Returns:
+    - Result of the startup scenario
+    """
+    Script = (
+        "import logging, time; logging.disable(logging.WARNING); Start = time.perf_counter(); "
+        "import YouTube_Data_Harvesting as Harvesting; Imported = time.perf_counter(); "
+        "Harvesting.API_Connection('benchmark-key'); Built = time.perf_counter(); "
+        "Harvesting.API_Connection('benchmark-key'); Next = time.perf_counter(); "
+        "print(Imported - Start, Built - Imported, Next - Built)"
+    )
+    Output = subprocess.run([sys.executable, '-c', Script], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout.split()
+    Import_Seconds, Build_Seconds, Next_Seconds = (float(value) for value in Output[-3:])
+    Home_Seconds, Home_Imports = Measure_Home_Page()
+    return {
+        'Scenario': 'startup',
+        'Cold_Import_Seconds': round(Import_Seconds, 3),
+        'Client_Build_Seconds': round(Build_Seconds, 4),
+        'Next_Client_Seconds': round(Next_Seconds, 4),
+        'Home_Page_Seconds': round(Home_Seconds, 3),
+        'Home_Page_Imports': Home_Imports
+    }
+
+
+def Legacy_Video_Details(Video_Items, Comment_Items, Playlist_Id):
+    """
+    Video details in the dict layout used before the compact records ({"Video_Id_N": {...}} with string statistics).
+
+    """
+    Video_Details = []
+    for count, video in enumerate(Video_Items, 1):
+        Comments = [{"Comment_Id_" + str(number): {
+                        "Comment_Id": cmt['snippet']['topLevelComment']['id'],
+                        "Comment_Text": cmt['snippet']['topLevelComment']['snippet']['textDisplay'],
+                        "Comment_Author": cmt['snippet']['topLevelComment']['snippet']['authorDisplayName'],
+                        "Comment_PublishedAt": cmt['snippet']['topLevelComment']['snippet']['publishedAt']}}
+                    for number, cmt in enumerate(Comment_Items[video['id']], 1)]
+        Video_Details.append({"Video_Id_" + str(count): {
+            "Channel_ID": video['snippet']['channelId'], "Video_Id": video['id'],
+            "Video_Name": video['snippet']['title'], "Video_Description": video['snippet']['description'],
+            "Tags": video['snippet'].get('tags'), "PublishedAt": video['snippet']['publishedAt'],
+            "View_Count": video['statistics']['viewCount'], "Like_Count": video['statistics'].get('likeCount'),
+            "Dislike_Count": video['statistics'].get('dislikeCount'),
+            "Favorite_Count": video['statistics'].get('favoriteCount'),
+            "Comment_Count": video['statistics'].get('commentCount'), "Duration": video['contentDetails']['duration'],
+            "Thumbnail": video['snippet']['thumbnails']['default']['url'],
+            "Caption_Status": video['contentDetails']['caption'], "Playlist_ID": Playlist_Id, "Comments": Comments}})
+    return Video_Details
+
+
+def Measure_Record_Memory(Youtube):
+    """
+    Memory held by the scraped videos and comments of the first synthetic channel in the legacy dict layout
+    and as compact records, and the time of a full garbage collection while they are alive.
+
+    Returns:
+    - Result of the memory scenario
+    """
+    Channel_Id = Youtube.Channel_Ids[0]
+    Video_Ids = [f'{Channel_Id}-v{index:06d}' for index in range(Youtube.Videos_Per_Channel)]
+    Video_Items = [item for start in range(0, len(Video_Ids), 50)
+                   for item in Youtube.List_videos({'id': ','.join(Video_Ids[start:start + 50])})['items']]
+    Comment_Items = {video_id: Youtube.List_commentThreads({'videoId': video_id, 'maxResults': Youtube.Comments_Per_Video})['items']
+                     for video_id in Video_Ids}
+
+    Builders = {
+        'Dicts': lambda: Legacy_Video_Details(Video_Items, Comment_Items, 'UU' + Channel_Id[2:]),
+        'Records': lambda: [Harvesting.VideoRecord.From_Api_Item(video, 'UU' + Channel_Id[2:],
+                                                                 [Harvesting.CommentRecord.From_Api_Item(cmt) for cmt in Comment_Items[video['id']]])
+                            for video in Video_Items]
+    }
+    Result = {'Scenario': 'memory', 'Videos': len(Video_Items), 'Comments': len(Video_Items) * Youtube.Comments_Per_Video}
+    for name, Build in Builders.items():
+        gc.collect()
+        tracemalloc.start()
+        Structure = Build()
+        Result[f'{name}_MB'] = round(tracemalloc.get_traced_memory()[0] / 1024 / 1024, 2)
+        tracemalloc.stop()
+        Start = time.perf_counter()
+        gc.collect()
+        Result[f'{name}_GC_Seconds'] = round(time.perf_counter() - Start, 4)
+        del Structure
+    return Result
+
+
+def Clean_Benchmark_Data(Channel_Ids):
+    """
+    Remove the synthetic channels from the MongoDB collections and the MySQL tables.
+
+    """
+    Harvesting.Clear_TempDB_In_MongoDB(Run_Id)
+    Harvesting.Connect_To_MongoDB().delete_many({'ChannelDetails.Channel_Id': {'$in': Channel_Ids}})
+    connection = Harvesting.connect_to_mysql()
+    if connection is None:
+        return
+    cursor = connection.cursor()
+    Placeholders = ','.join(['%s'] * len(Channel_Ids))
+    cursor.execute(f"DELETE C FROM comment C JOIN video V ON C.video_id = V.video_id WHERE V.playlist_id IN ({Placeholders})", Channel_Ids)
+    cursor.execute(f"DELETE FROM video WHERE playlist_id IN ({Placeholders})", Channel_Ids)
+    cursor.execute(f"DELETE FROM playlist WHERE channel_id IN ({Placeholders})", Channel_Ids)
+    cursor.execute(f"DELETE FROM Channel WHERE channel_id IN ({Placeholders})", Channel_Ids)
+    connection.commit()
+    cursor.close()
+    connection.close()
+
+
+def Run_Scenario_Process(Name, Arguments):
+    """
+    Run one scenario in a fresh benchmark process, so its peak RSS is its own and not the peak of
+    the scenarios run before it.
+
+    Returns:
+    - Result of the scenario
+    """
+    Command = [sys.executable, os.path.abspath(__file__), '--scenario', Name]
+    for key, value in vars(Arguments).items():
+        if key in ('scenario', 'output', 'cleanup') or value is None or value is False:
+            continue
+        Command.append('--' + key.replace('_', '-'))
+        if value is not True:
+            Command.append(str(value))
+    Process = subprocess.run(Command, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if Process.returncode:
+        raise RuntimeError(f'The {Name} scenario failed:\n{Process.stderr[-2000:]}')
+    # The app prints progress messages, the result is the last JSON line
+    return json.loads([line for line in Process.stdout.splitlines() if line.startswith('{')][-1])
+
+
+def Run_Benchmark(Arguments):
+    # Separate response cache, so the synthetic responses never mix with the cached real ones
+    os.environ['YT_API_CACHE_DIR'] = Arguments.cache_dir
+    os.environ['YT_API_CACHE_MB'] = str(Arguments.cache_mb)
+    os.environ['YT_FIELD_MASKS'] = '0' if Arguments.no_field_masks else '1'
+    Youtube = FakeYouTube(Channels=Arguments.channels, Videos_Per_Channel=Arguments.videos,
+                          Comments_Per_Video=Arguments.comments, Playlists_Per_Channel=Arguments.playlists,
+                          Latency=Arguments.latency / 1000)
+    Channel_Ids = Youtube.Channel_Ids
+    Client = Fake_Key_Pool(Youtube, Arguments.api_keys, Arguments.key_quota) if Arguments.api_keys > 1 else Youtube
+    Videos = Arguments.channels * Arguments.videos
+    Comments = Videos * Arguments.comments
+
+    def Scrape():
+        Harvesting.Clear_TempDB_In_MongoDB(Run_Id)
+        Harvesting.Main_Scraping(Client, Channel_Ids, Channel_Ids, Workers=Arguments.api_keys, Run_Id=Run_Id)
+
+    def Upload_MongoDB():
+        Harvesting.Move_from_tempdb_to_mongodb(Run_Id)
+
+    def Migrate_MySQL():
+        collection = Harvesting.Connect_To_MongoDB()
+        Failed = Harvesting.Migrate_Channels_To_MySQL(collection, Harvesting.Channel_Namelist_In_TempDB_In_MongoDB(Run_Id),
+                                                      Arguments.mysql_workers, Run_Id)
+        if Failed:
+            raise RuntimeError(f'MySQL migration failed: {Failed}')
+
+    Scenarios = {'scrape': Scrape, 'rescrape': Scrape, 'mongodb': Upload_MongoDB, 'mysql': Migrate_MySQL}
+    Selected = list(Scenarios) if Arguments.scenario == 'all' else [name for name in Scenarios if name == Arguments.scenario]
+
+    Results = []
+    if Arguments.scenario in ('startup', 'all'):
+        Results.append(Measure_Startup())
+        print(json.dumps(Results[-1]))
+    if Arguments.scenario in ('memory', 'all'):
+        Results.append(Measure_Record_Memory(Youtube))
+        print(json.dumps(Results[-1]))
+    try:
+        for name in Selected:
+            if len(Selected) > 1:
+                Results.append(Run_Scenario_Process(name, Arguments))
+            else:
+                Results.append(Run_Scenario(name, Scenarios[name], Videos, Comments))
+            print(json.dumps(Results[-1]))
+    finally:
+        if Arguments.cleanup:
+            Clean_Benchmark_Data(Channel_Ids)
+
+    if Arguments.output:
+        with open(Arguments.output, 'w') as file:
+            json.dump({'Config': vars(Arguments), 'Results': Results}, file, indent=2)
+    return Results
+
+
+def Parse_Arguments():
+    parser = argparse.ArgumentParser(description='Benchmark the YouTube Data Harvesting pipeline against a fake YouTube API.')
+    parser.add_argument('--scenario', choices=['startup', 'memory', 'scrape', 'rescrape', 'mongodb', 'mysql', 'all'], default='all',
+                        help='startup measures the app import and client build; memory compares the dict and record '
+                             'layouts of the scraped videos; rescrape repeats scrape with a warm '
+                             'API response cache; mongodb and mysql reuse the data left in the temporary database by scrape')
+    parser.add_argument('--channels', type=int, default=1, help='Number of synthetic channels')
+    parser.add_argument('--videos', type=int, default=100, help='Videos per channel (10 to 100000)')
+    parser.add_argument('--comments', type=int, default=10, help='Comments per video')
+    parser.add_argument('--playlists', type=int, default=5, help='Playlists per channel')
+    parser.add_argument('--mysql-workers', type=int, default=4, help='MySQL connections used by the mysql scenario')
+    parser.add_argument('--api-keys', type=int, default=1, help='Number of fake API keys pooled by the scrape scenarios, '
+                                                                  'with one harvest worker thread per key')
+    parser.add_argument('--key-quota', type=int, default=0, help='Calls allowed per fake API key before quotaExceeded (0 for no limit)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Simulated API latency per call in milliseconds')
+    parser.add_argument('--cache-dir', default='.api_cache_benchmark', help='Folder of the benchmark API response cache')
+    parser.add_argument('--cache-mb', type=float, default=256, help='Size of the API response cache in MB (0 disables it)')
+    parser.add_argument('--no-field-masks', action='store_true', help='Request the full responses instead of the field masks')
+    parser.add_argument('--output', help='Write the results as JSON into this file')
+    parser.add_argument('--cleanup', action='store_true', help='Remove the synthetic channels from MongoDB and MySQL afterwards')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    Run_Benchmark(Parse_Arguments())
@@ -0,0 +1,61 @@
+# Main Objective:     Scrape YouTube channels on any number of machines sharing the same MongoDB.
+#                     Workers claim the channel, video batch and assemble tasks of the HarvestTasks queue
+#                     through leases, so more workers (or more API keys) scrape a run faster.
+
+# Usage:              python Harvest_Worker.py --api-key KEY1,KEY2 --run-id 20240212101500_a1b2c3
+#                     python Harvest_Worker.py --api-key KEY1 --channels @channel1,@channel2    (queue a new run and work on it)
+
+
+import argparse
+import json
+import logging
+import os
+
+logging.disable(logging.WARNING)  # Streamlit warns on every st.* call outside "streamlit run"
+
+import YouTube_Data_Harvesting as Harvesting
+
+
+def Run_Worker(Arguments):
+    API_Keys = tuple(dict.fromkeys(key.strip() for key in Arguments.api_key.split(',') if key.strip()))
+    if not API_Keys:
+        raise SystemExit('Provide the API key(s) with --api-key or the YT_API_KEYS environment variable')
+    # Also for a single key: the pool builds one client per worker thread, a googleapiclient client is not thread safe
+    Youtube = Harvesting.API_Key_Pool(API_Keys)
+
+    Run_Id = Arguments.run_id
+    if Arguments.channels:
+        Run_Id = Run_Id or Harvesting.New_Run_Id()
+        Resolved, Invalid = Harvesting.Resolve_Channels(Youtube, [channel.strip() for channel in Arguments.channels.split(',')])
+        if Invalid:
+            print(f'{len(Invalid)} Channel Id(s) could not be found and will be skipped: ' + ", ".join(Invalid))
+        Channel_Ids = Harvesting.Enqueue_Channels(Resolved.values(), Run_Id)
+        print(f'Queued {len(Channel_Ids)} channel(s) in the harvest run {Run_Id}')
+
+    # One worker thread per API key unless told otherwise
+    Workers = Arguments.workers or len(API_Keys)
+    Harvesting.Start_Run('harvest_worker')
+    try:
+        Tasks = Harvesting.Run_Harvest_Workers(Youtube, Run_Id, Workers, All_Runs=Run_Id is None,
+                                               Lease_Seconds=Arguments.lease, Wait=Arguments.wait)
+    finally:
+        Report = Harvesting.Finish_Run()
+    print(json.dumps({'Run_Id': Run_Id, 'Tasks': Tasks, 'Duration_Seconds': Report['Duration_Seconds'],
+                      'Failed_Channels': Harvesting.Failed_Channels(Run_Id) if Run_Id else {}}))
+    print(json.dumps(Youtube.Usage()))
+
+
+def Parse_Arguments():
+    parser = argparse.ArgumentParser(description='Scrape the queued YouTube channels together with the other harvest workers.')
+    parser.add_argument('--api-key', default=os.environ.get('YT_API_KEYS', ''),
+                        help='YouTube Data API key, or several keys separated by commas (default: YT_API_KEYS)')
+    parser.add_argument('--run-id', help='Harvest run to work on (default: every run with queued tasks)')
+    parser.add_argument('--channels', help='Channel IDs, @handles or channel URLs separated by commas, queued as a new run before working')
+    parser.add_argument('--workers', type=int, default=0, help='Worker threads, each with its own API client (default: one per API key)')
+    parser.add_argument('--lease', type=float, default=120, help='Seconds a claimed task stays leased without a heartbeat')
+    parser.add_argument('--wait', action='store_true', help='Keep polling for new tasks instead of exiting once the queue is empty')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    Run_Worker(Parse_Arguments())
@@ -7,16 +7,29 @@
 # Uploaded On:        12/02/2024
 
 
-from googleapiclient.discovery import build
-from pymongo import MongoClient
-import mysql.connector
-from mysql.connector import errorcode
-from datetime import datetime
+import time
+Script_Start = time.perf_counter()  # Includes the imports below, recorded at the end of the script
+
+from datetime import datetime, timedelta
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import cProfile
+import pstats
+import hashlib
+import json
+import os
+import random
 import re
-import pandas as pd
+import socket
+import sqlite3
+import threading
+import zlib
 import streamlit as st
 from streamlit_option_menu import option_menu
-import plotly.express as px
+
 
 #___________________________Create Streamlit Page___________________________#
 
@@ -50,10 +63,483 @@ st.markdown(
 )
 
 
+#___________________________Pipeline Instrumentation___________________________#
+# YouTube Data API quota cost of one call per endpoint
+Quota_Cost = {'channels': 1, 'playlistItems': 1, 'videos': 1, 'playlists': 1, 'commentThreads': 1, 'search': 100}
+
+
+@st.cache_resource
+def Metrics_Registry():
+    """
+    Counters and timers shared by every rerun of the app and by the metrics endpoint.
+
+    Returns:
+    - Dictionary holding the lifetime totals and the metrics of the current run of every session
+    """
+    return {'lock': threading.Lock(), 'counters': defaultdict(float), 'timers': defaultdict(lambda: [0, 0.0, 0.0]),
+            'runs': {}}
+
+
+def Metric_Key(Name, Labels):
+    return (Name, tuple(sorted(Labels.items())))
+
+
+def Run_Key():
+    """
+    Key of the run the current thread records into: the Streamlit session (worker threads carry the
+    script run context of their session), or the process when running outside "streamlit run".
+
+    Returns:
+    - Session id, 'process' outside Streamlit
+    """
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else 'process'
+
+
+def Record_Counter(Name, Value=1, **Labels):
+    """
+    Add the value to the named counter, both in the lifetime totals and in the current run.
+    
+    """
+    Registry = Metrics_Registry()
+    key = Metric_Key(Name, Labels)
+    run = Registry['runs'].get(Run_Key())
+    with Registry['lock']:
+        Registry['counters'][key] += Value
+        if run is not None:
+            run['counters'][key] += Value
+
+
+def Record_Timing(Name, Seconds, **Labels):
+    """
+    Add one observation to the named timer (count, total seconds and slowest observation).
+    
+    """
+    Registry = Metrics_Registry()
+    key = Metric_Key(Name, Labels)
+    run = Registry['runs'].get(Run_Key())
+    with Registry['lock']:
+        timers = [Registry['timers']]
+        if run is not None:
+            timers.append(run['timers'])
+        for timer in timers:
+            timer[key][0] += 1
+            timer[key][1] += Seconds
+            timer[key][2] = max(timer[key][2], Seconds)
+
+
+@contextmanager
+def Stage_Timer(Name, **Labels):
+    """
+    Time the enclosed block and record it under the given stage name.
+    
+    """
+    Start = time.perf_counter()
+    try:
+        yield
+    finally:
+        Record_Timing(Name, time.perf_counter() - Start, **Labels)
+
+
+def Execute_Request(Request, Endpoint):
+    """
+    Execute a YouTube API request while recording its latency, call count, pages and quota units,
+    and the decoded size and JSON parse time of the response body.
+
+    Returns:
+    - The API response
+    """
+    # googleapiclient already asks for gzip, make sure it stays that way for every request
+    Request.headers.setdefault('accept-encoding', 'gzip, deflate')
+    Postproc = getattr(Request, 'postproc', None)
+    if Postproc is not None:
+        def Measured_Postproc(resp, content):
+            # httplib2 has already decompressed the body (and rewritten content-length), so this is the decoded
+            # size; the original encoding is kept in -content-encoding
+            Record_Counter('youtube_api_decoded_bytes_total', len(content), endpoint=Endpoint)
+            if resp.get('-content-encoding'):
+                Record_Counter('youtube_api_compressed_responses_total', endpoint=Endpoint, encoding=resp['-content-encoding'])
+            with Stage_Timer('youtube_api_parse_seconds', endpoint=Endpoint):
+                return Postproc(resp, content)
+        Request.postproc = Measured_Postproc
+
+    try:
+        with Stage_Timer('youtube_api_request_seconds', endpoint=Endpoint):
+            Response = Execute_Cached(Request, Endpoint)
+    except Exception:
+        Record_Counter('youtube_api_errors_total', endpoint=Endpoint)
+        raise
+    Record_Counter('youtube_api_calls_total', endpoint=Endpoint)
+    Record_Counter('youtube_api_quota_units_total', Quota_Cost.get(Endpoint, 1), endpoint=Endpoint)
+    if 'items' in Response:
+        Record_Counter('youtube_api_pages_total', endpoint=Endpoint)
+        Record_Counter('youtube_api_items_total', len(Response['items']), endpoint=Endpoint)
+    return Response
+
+
+def Start_Profiler():
+    """
+    Returns:
+    - cProfile profiler enabled on the calling thread, None when another profiler is already active
+    """
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        print(f'The run could not be profiled: {e}')
+        return None
+    return profiler
+
+
+def Start_Run(Run_Type, Profile=False):
+    """
+    Start collecting the metrics of one scrape or migration run of the current session.
+    When Profile is set the run is also profiled with cProfile.
+    
+    """
+    Registry = Metrics_Registry()
+    run = {'Run_Type': Run_Type, 'Started_At': datetime.utcnow(), 'Start': time.perf_counter(),
+           'counters': defaultdict(float), 'timers': defaultdict(lambda: [0, 0.0, 0.0]),
+           'profiler': Start_Profiler() if Profile else None, 'thread_profilers': []}
+    with Registry['lock']:
+        Registry['runs'][Run_Key()] = run
+
+
+def Run_Profiled(Function, *Args, **Kwargs):
+    """
+    Call the function on a worker thread, under its own profiler when the run is profiled
+    (cProfile only sees the thread which enabled it).
+
+    Returns:
+    - Result of the function
+    """
+    Registry = Metrics_Registry()
+    run = Registry['runs'].get(Run_Key())
+    profiler = Start_Profiler() if run is not None and run['profiler'] is not None else None
+    try:
+        return Function(*Args, **Kwargs)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            with Registry['lock']:
+                run['thread_profilers'].append(profiler)
+
+
+def Finish_Run():
+    """
+    Stop collecting the metrics of the current run of the session and save the run report into MongoDB.
+
+    Returns:
+    - Run report of the current run (None if no run was started)
+    """
+    Registry = Metrics_Registry()
+    with Registry['lock']:
+        run = Registry['runs'].pop(Run_Key(), None)
+    if run is None:
+        return None
+    profiler = run['profiler']
+
+    Duration = time.perf_counter() - run['Start']
+    Report = {
+        'Run_Type': run['Run_Type'],
+        'Started_At': run['Started_At'],
+        'Duration_Seconds': round(Duration, 3),
+        'Counters': [{'Metric': name, 'Labels': dict(labels), 'Value': value}
+                     for (name, labels), value in sorted(run['counters'].items())],
+        'Timers': [{'Metric': name, 'Labels': dict(labels), 'Count': count, 'Total_Seconds': round(total, 4),
+                    'Max_Seconds': round(slowest, 4)}
+                   for (name, labels), (count, total, slowest) in sorted(run['timers'].items())]
+    }
+    Lookups = defaultdict(lambda: {'hit': 0, 'miss': 0})
+    for item in Report['Counters']:
+        if item['Metric'] == 'api_cache_lookups_total':
+            Lookups[item['Labels']['endpoint']][item['Labels']['result']] += item['Value']
+    if Lookups:
+        Report['Cache_Hit_Rate'] = {endpoint: round(result['hit'] / (result['hit'] + result['miss']), 3)
+                                    for endpoint, result in Lookups.items()}
+
+    Rows = sum(item['Value'] for item in Report['Counters'] if item['Metric'] == 'mysql_rows_total')
+    if Rows:
+        Report['MySQL_Rows_Per_Second'] = round(Rows / Duration, 2)
+
+    if profiler is not None:
+        profiler.disable()
+        Stats = pstats.Stats(profiler)
+        for thread_profiler in run['thread_profilers']:
+            Stats.add(thread_profiler)
+        os.makedirs('profiles', exist_ok=True)
+        Report['Profile_Path'] = os.path.join('profiles', f"{run['Run_Type']}-{run['Started_At']:%Y%m%d%H%M%S%f}.prof")
+        Stats.dump_stats(Report['Profile_Path'])
+
+    try:
+        client = Mongo_Client()
+        client['YouTubeScrapingMongoDB']['PipelineRunReports'].insert_one(dict(Report))
+    except Exception as e:
+        print(f'An error occurred while saving the run report into MongoDB: {e}')
+    return Report
+
+
+def Display_Run_Report(Report):
+    """
+    Show the stage timings and counters of a run report in the Streamlit page.
+    
+    """
+    if not Report:
+        return
+    import pandas as pd
+
+    with st.expander(f"Run metrics ({Report['Duration_Seconds']} seconds)"):
+        if Report['Timers']:
+            st.dataframe(pd.DataFrame([dict(Metric=item['Metric'], **item['Labels'], Count=item['Count'],
+                                            Total_Seconds=item['Total_Seconds'], Max_Seconds=item['Max_Seconds'])
+                                       for item in Report['Timers']]))
+        if Report['Counters']:
+            st.dataframe(pd.DataFrame([dict(Metric=item['Metric'], **item['Labels'], Value=item['Value'])
+                                       for item in Report['Counters']]))
+        if 'Cache_Hit_Rate' in Report:
+            st.write('API cache hit rate: ' + ", ".join(f'{endpoint} {rate:.0%}' for endpoint, rate in Report['Cache_Hit_Rate'].items()))
+        if 'MySQL_Rows_Per_Second' in Report:
+            st.write(f"MySQL rows/sec: {Report['MySQL_Rows_Per_Second']}")
+        if 'Profile_Path' in Report:
+            st.write(f"cProfile stats saved to {Report['Profile_Path']}")
+
+
+def Prometheus_Metrics_Text():
+    """
+    Render the lifetime counters and timers in the Prometheus text exposition format.
+
+    Returns:
+    - Metrics text
+    """
+    def Escape(Value):
+        return str(Value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    def Sample(Name, Labels, Value):
+        label_text = ','.join(f'{key}="{Escape(value)}"' for key, value in Labels)
+        return f'youtube_harvesting_{Name}{{{label_text}}} {Value}' if label_text else f'youtube_harvesting_{Name} {Value}'
+
+    Registry = Metrics_Registry()
+    Lines = []
+    with Registry['lock']:
+        for (name, labels), value in sorted(Registry['counters'].items()):
+            Lines.append(Sample(name, labels, value))
+        for (name, labels), (count, total, slowest) in sorted(Registry['timers'].items()):
+            Lines.append(Sample(name + '_count', labels, count))
+            Lines.append(Sample(name + '_sum', labels, total))
+            Lines.append(Sample(name + '_max', labels, slowest))
+    return '\n'.join(Lines) + '\n'
+
+
+@st.cache_resource
+def Start_Metrics_Server(Port, Host=None):
+    """
+    Serve the Prometheus metrics on http://<Host>:<Port>/metrics from a background thread.
+    The endpoint has no authentication, so it only listens on localhost unless YT_METRICS_HOST says otherwise.
+    Started once per process, whatever the number of reruns.
+    
+    """
+    class Metrics_Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = Prometheus_Metrics_Text().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((Host or os.environ.get('YT_METRICS_HOST', '127.0.0.1'), Port), Metrics_Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+#___________________________API Response Cache___________________________#
+@st.cache_resource
+def Response_Cache(Cache_Dir=None, Max_MB=None):
+    """
+    Opens the on-disk cache of YouTube API responses (SQLite), keyed by request with ETag and body.
+    Folder and size come from the YT_API_CACHE_DIR / YT_API_CACHE_MB environment variables, a size of 0 disables the cache.
+    The cache file may be shared by several harvest worker processes.
+
+    Returns:
+    - Dictionary holding the cache connection, lock and size limit (None if disabled or the cache cannot be opened)
+    """
+    Cache_Dir = Cache_Dir or os.environ.get('YT_API_CACHE_DIR', '.api_cache')
+    Max_Bytes = int(float(Max_MB if Max_MB is not None else os.environ.get('YT_API_CACHE_MB', 256)) * 1024 * 1024)
+    if Max_Bytes <= 0:
+        return None
+    try:
+        os.makedirs(Cache_Dir, exist_ok=True)
+        connection = sqlite3.connect(os.path.join(Cache_Dir, 'youtube_responses.sqlite'), check_same_thread=False)
+        connection.execute("""CREATE TABLE IF NOT EXISTS response (
+                                request_key TEXT PRIMARY KEY,
+                                endpoint TEXT,
+                                etag TEXT,
+                                body BLOB,
+                                size INTEGER,
+                                last_access REAL)""")
+        connection.execute("CREATE INDEX IF NOT EXISTS response_last_access ON response (last_access)")
+    except (OSError, sqlite3.Error) as e:
+        print(f"The API response cache could not be opened, requests are not cached: {e}")
+        return None
+    return {'connection': connection, 'lock': threading.Lock(), 'max_bytes': Max_Bytes}
+
+
+def Cache_Key(Request):
+    """
+    Cache key of a request: its URI without the API key, so all keys share the cached responses.
+
+    Returns:
+    - SHA-256 hex digest of the request
+    """
+    Parts = urlsplit(Request.uri)
+    Query = urlencode(sorted((key, value) for key, value in parse_qsl(Parts.query) if key != 'key'))
+    return hashlib.sha256(f'{Parts.path}?{Query}'.encode()).hexdigest()
+
+
+# The cache is best effort: a failing cache (e.g. locked by another worker process) never fails the request
+def Cache_Error(Operation, Error):
+    Record_Counter('api_cache_errors_total', op=Operation)
+    print(f"The API response cache could not {Operation} a response: {Error}")
+
+
+def Cache_Etag(Cache, Key):
+    """
+    Returns:
+    - ETag of the cached request, None if it is not cached or the cache cannot be read
+    """
+    try:
+        with Cache['lock']:
+            row = Cache['connection'].execute("SELECT etag FROM response WHERE request_key = ?", (Key,)).fetchone()
+    except sqlite3.Error as e:
+        Cache_Error('read', e)
+        return None
+    return row[0] if row else None
+
+
+def Cache_Lookup(Cache, Key):
+    """
+    Only called on a 304 answer: bodies of pages which changed are never decompressed and parsed.
+
+    Returns:
+    - Cached response of the request, None if it was evicted meanwhile or the cache cannot be read
+    """
+    try:
+        with Cache['lock']:
+            row = Cache['connection'].execute("SELECT body FROM response WHERE request_key = ?", (Key,)).fetchone()
+    except sqlite3.Error as e:
+        Cache_Error('read', e)
+        return None
+    return json.loads(zlib.decompress(row[0])) if row else None
+
+
+def Cache_Touch(Cache, Key):
+    try:
+        with Cache['lock']:
+            Cache['connection'].execute("UPDATE response SET last_access = ? WHERE request_key = ?", (time.time(), Key))
+            Cache['connection'].commit()
+    except sqlite3.Error as e:
+        with Cache['lock']:
+            Cache['connection'].rollback()
+        Cache_Error('touch', e)
+
+
+def Cache_Store(Cache, Key, Endpoint, Response):
+    """
+    Store the response with its ETag, then evict the least recently used responses above the size limit.
+    The size is read from the file, so the limit holds for all the processes sharing the cache.
+    
+    """
+    Etag = Response.get('etag')
+    if not Etag:
+        return
+    Body = zlib.compress(json.dumps(Response).encode())
+    connection = Cache['connection']
+    try:
+        with Cache['lock']:
+            connection.execute("INSERT OR REPLACE INTO response VALUES (?, ?, ?, ?, ?, ?)",
+                               (Key, Endpoint, Etag, Body, len(Body), time.time()))
+            Size = connection.execute("SELECT COALESCE(SUM(size), 0) FROM response").fetchone()[0]
+
+            if Size > Cache['max_bytes']:
+                # Evict down to 90% of the limit so every store does not trigger an eviction
+                Target = Cache['max_bytes'] * 0.9
+                for request_key, size in connection.execute("SELECT request_key, size FROM response ORDER BY last_access").fetchall():
+                    if Size <= Target:
+                        break
+                    connection.execute("DELETE FROM response WHERE request_key = ?", (request_key,))
+                    Size -= size
+                    Record_Counter('api_cache_evictions_total', endpoint=Endpoint)
+            connection.commit()
+    except sqlite3.Error as e:
+        with Cache['lock']:
+            connection.rollback()
+        Cache_Error('store', e)
+
+
+def Execute_Cached(Request, Endpoint):
+    """
+    Execute the request conditionally: when the response is cached, its ETag is sent as If-None-Match
+    and a 304 Not Modified answer is served from the cache.
+
+    Returns:
+    - The API response
+    """
+    from googleapiclient.errors import HttpError
+
+    Cache = Response_Cache()
+    if Cache is None:
+        return Request.execute()
+
+    Key = Cache_Key(Request)
+    Etag = Cache_Etag(Cache, Key)
+    if Etag:
+        Request.headers['If-None-Match'] = Etag
+    try:
+        Response = Request.execute()
+    except HttpError as e:
+        if e.resp.status != 304:
+            raise
+        Cached_Response = Cache_Lookup(Cache, Key)
+        if Cached_Response is not None:
+            Record_Counter('api_cache_lookups_total', endpoint=Endpoint, result='hit')
+            Cache_Touch(Cache, Key)
+            return Cached_Response
+        # Evicted between the ETag lookup and the answer: ask for the full response again
+        del Request.headers['If-None-Match']
+        Response = Request.execute()
+    Record_Counter('api_cache_lookups_total', endpoint=Endpoint, result='miss')
+    Cache_Store(Cache, Key, Endpoint, Response)
+    return Response
+
+
 #___________________________Create API Connection___________________________#
+@st.cache_resource(show_spinner=False)
+def Discovery_Document():
+    """
+    The YouTube Data API v3 discovery document bundled with googleapiclient, read and parsed once per process.
+    Only the (read-only) document is shared: the clients themselves are not thread safe.
+
+    Returns:
+    - The parsed discovery document
+    """
+    from googleapiclient.discovery_cache import get_static_doc
+
+    return json.loads(get_static_doc('youtube', 'v3'))
+
+
 def API_Connection(API_Key):
     """
     Builds the YouTube API client using the provided API key.
+    Every call builds a new client with its own HTTP connection, so two sessions scraping with the same key
+    never share one; building it from the cached discovery document takes well under a millisecond.
 
     Args:
     API_Key: The API key to use for authentication.
@@ -62,12 +548,360 @@ def API_Connection(API_Key):
     YouTube: The built YouTube API client.
     
     """
-    Youtube = build('youtube','v3',developerKey = API_Key)
-    API_Key = API_Key
+    return Build_API_Client(API_Key)
+
+
+def Build_API_Client(API_Key):
+    from googleapiclient.discovery import build_from_document
+
+    with Stage_Timer('youtube_client_build_seconds'):
+        Youtube = build_from_document(Discovery_Document(), developerKey = API_Key)
     return Youtube
 
+
+#___________________________API Key Pool___________________________#
+# Reasons of the 403 answers telling that a key used its daily quota, or is sending too fast
+Quota_Exceeded_Reasons = {'quotaExceeded', 'dailyLimitExceeded'}
+Rate_Limit_Reasons = {'rateLimitExceeded', 'userRateLimitExceeded'}
+
+
+def Api_Error_Reasons(Error):
+    """
+    Returns:
+    - Set of the error reasons in the body of a YouTube API HttpError
+    """
+    try:
+        return {error.get('reason') for error in json.loads(Error.content)['error'].get('errors', [])}
+    except Exception:
+        return set()
+
+
+def Key_Label(API_Key):
+    # Never show the full key in reports and metrics
+    return f'...{API_Key[-4:]}'
+
+
+class API_Key_Pool:
+    """
+    Several API keys used as one YouTube API client. Every request runs on the key with the most quota
+    left today; on quotaExceeded the key is set aside until the quota resets (midnight Pacific time)
+    and the same request, page token included, is retried on the next key.
+
+    Clients are built per thread and per key, as the googleapiclient clients are not thread safe.
+
+    """
+    def __init__(self, API_Keys, Daily_Quota=None, Client_Factory=None):
+        self.API_Keys = list(dict.fromkeys(API_Keys))
+        self.Daily_Quota = int(Daily_Quota or os.environ.get('YT_API_KEY_QUOTA', 10000))
+        self.Client_Factory = Client_Factory or Build_API_Client
+        self.Lock = threading.Lock()
+        self.Local = threading.local()
+        self.Day = self.Quota_Day()
+        self.Used = {key: 0 for key in self.API_Keys}
+        self.Exhausted = set()
+        self.Cooling_Until = {}
+
+    @staticmethod
+    def Quota_Day():
+        from zoneinfo import ZoneInfo
+        return datetime.now(ZoneInfo('America/Los_Angeles')).date()
+
+    def __getattr__(self, Endpoint):
+        if Endpoint in Quota_Cost:
+            return lambda: Pooled_Resource(self, Endpoint)
+        raise AttributeError(Endpoint)
+
+    def Client(self, API_Key):
+        """
+        Returns:
+        - The client of the key for the current thread
+        """
+        Clients = self.Local.__dict__.setdefault('clients', {})
+        if API_Key not in Clients:
+            Clients[API_Key] = self.Client_Factory(API_Key)
+        return Clients[API_Key]
+
+    def Best_Key(self):
+        """
+        Returns:
+        - The usable key with the most quota left, the first to leave its rate limit when every key is
+          rate limited, None when every key is exhausted
+        """
+        with self.Lock:
+            if self.Quota_Day() != self.Day:
+                self.Day = self.Quota_Day()
+                self.Used = {key: 0 for key in self.API_Keys}
+                self.Exhausted.clear()
+            Now = time.monotonic()
+            Usable = [key for key in self.API_Keys if key not in self.Exhausted and self.Cooling_Until.get(key, 0) <= Now]
+            if not Usable:
+                # Every key is rate limited: the one cooling down the shortest, the caller waits for it
+                return min((key for key in self.API_Keys if key not in self.Exhausted),
+                           key=lambda key: self.Cooling_Until.get(key, 0), default=None)
+            return max(Usable, key=lambda key: self.Daily_Quota - self.Used[key], default=None)
+
+    def Cooling_Seconds(self, API_Key):
+        """
+        Returns:
+        - Seconds until the rate limited key may be used again, 0 when it is not rate limited
+        """
+        with self.Lock:
+            return max(0, self.Cooling_Until.get(API_Key, 0) - time.monotonic())
+
+    def Charge(self, API_Key, Endpoint):
+        Cost = Quota_Cost.get(Endpoint, 1)
+        with self.Lock:
+            self.Used[API_Key] += Cost
+        Record_Counter('youtube_api_key_quota_units_total', Cost, key=Key_Label(API_Key))
+
+    def Set_Aside(self, API_Key, Reasons):
+        with self.Lock:
+            if Reasons & Quota_Exceeded_Reasons:
+                self.Exhausted.add(API_Key)
+            else:
+                self.Cooling_Until[API_Key] = time.monotonic() + 10
+        Record_Counter('youtube_api_key_failovers_total', key=Key_Label(API_Key), reason=sorted(Reasons)[0])
+
+    def Usage(self):
+        """
+        Returns:
+        - One row per key with the quota used and left today
+        """
+        with self.Lock:
+            return [{'API Key': Key_Label(key), 'Quota Used': self.Used[key],
+                     'Quota Left': 0 if key in self.Exhausted else max(0, self.Daily_Quota - self.Used[key]),
+                     'Exhausted': key in self.Exhausted}
+                    for key in self.API_Keys]
+
+
+class Pooled_Resource:
+    def __init__(self, Pool, Endpoint):
+        self.Pool = Pool
+        self.Endpoint = Endpoint
+
+    def list(self, **Params):
+        return Pooled_Request(self.Pool, self.Endpoint, Params)
+
+
+class Pooled_Request:
+    """
+    Request of an API_Key_Pool, built on the best key and rebuilt with the same parameters
+    (headers and postproc included) when it has to move to another key.
+
+    """
+    def __init__(self, Pool, Endpoint, Params):
+        self.Pool = Pool
+        self.Endpoint = Endpoint
+        self.Params = Params
+        self.API_Key = Pool.Best_Key() or Pool.API_Keys[0]
+        self.Request = getattr(Pool.Client(self.API_Key), Endpoint)().list(**Params)
+
+    @property
+    def uri(self):
+        return self.Request.uri
+
+    @property
+    def headers(self):
+        return self.Request.headers
+
+    @property
+    def postproc(self):
+        return self.Request.postproc
+
+    @postproc.setter
+    def postproc(self, Value):
+        self.Request.postproc = Value
+
+    def Move_To(self, API_Key):
+        Request = getattr(self.Pool.Client(API_Key), self.Endpoint)().list(**self.Params)
+        Request.headers.update(self.Request.headers)
+        Request.postproc = self.Request.postproc
+        self.API_Key, self.Request = API_Key, Request
+
+    def execute(self):
+        from googleapiclient.errors import HttpError
+
+        Failovers = 0
+        while True:
+            API_Key = self.Pool.Best_Key()
+            if API_Key is None:
+                raise RuntimeError('Every API key has exceeded its daily quota')
+            if API_Key != self.API_Key:
+                self.Move_To(API_Key)
+            Wait = self.Pool.Cooling_Seconds(API_Key)
+            if Wait:
+                time.sleep(Wait)
+            self.Pool.Charge(API_Key, self.Endpoint)
+            try:
+                return self.Request.execute()
+            except HttpError as e:
+                Reasons = Api_Error_Reasons(e) & (Quota_Exceeded_Reasons | Rate_Limit_Reasons)
+                if e.resp.status != 403 or not Reasons:
+                    raise
+                self.Pool.Set_Aside(API_Key, Reasons)
+                Failovers += 1
+                if Failovers >= 2 * len(self.Pool.API_Keys):
+                    raise
+
+
+@st.cache_resource(show_spinner=False)
+def API_Key_Pool_Connection(API_Keys):
+    """
+    API key pool of the given keys, kept across reruns so the quota used today is remembered.
+
+    Returns:
+    - API_Key_Pool usable in place of the YouTube API client
+    """
+    return API_Key_Pool(API_Keys)
        
+#___________________________Compact Records___________________________#
+class CommentRecord:
+    """
+    One scraped comment with its publish time parsed, stored in slots instead of a per-comment dict.
+    
+    """
+    __slots__ = ('Comment_Id', 'Comment_Text', 'Comment_Author', 'Comment_PublishedAt')
+
+    def __init__(self, Comment_Id, Comment_Text, Comment_Author, Comment_PublishedAt):
+        self.Comment_Id = Comment_Id
+        self.Comment_Text = Comment_Text
+        self.Comment_Author = Comment_Author
+        self.Comment_PublishedAt = Comment_PublishedAt
+
+    @classmethod
+    def From_Api_Item(cls, Item):
+        comment = Item['snippet']['topLevelComment']['snippet']
+        return cls(Item['snippet']['topLevelComment']['id'], comment['textDisplay'],
+                   comment['authorDisplayName'], Parse_Timestamp(comment['publishedAt']))
+
+    @classmethod
+    def From_Document(cls, Document):
+        """Build the record from a stored comment (string or typed values), None for an empty entry."""
+        if not Document:
+            return None
+        return cls(Document.get('Comment_Id', ''), Document.get('Comment_Text', ''),
+                   Document.get('Comment_Author', ''), Parse_Timestamp(Document.get('Comment_PublishedAt')))
+
+    def To_Document(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class VideoRecord:
+    """
+    One scraped video with its statistics parsed to int, publish time to datetime and duration to seconds.
+    
+    """
+    __slots__ = ('Channel_ID', 'Video_Id', 'Video_Name', 'Video_Description', 'Tags', 'PublishedAt',
+                 'View_Count', 'Like_Count', 'Dislike_Count', 'Favorite_Count', 'Comment_Count',
+                 'Duration', 'Thumbnail', 'Caption_Status', 'Playlist_ID', 'Comments')
+
+    def __init__(self, **Values):
+        for slot in self.__slots__:
+            setattr(self, slot, Values.get(slot))
+        if self.Comments is None:
+            self.Comments = []
+
+    @classmethod
+    def From_Api_Item(cls, Item, Playlist_Id, Comments):
+        return cls(
+            Channel_ID = Item['snippet']['channelId'],
+            Video_Id = Item['id'],
+            Video_Name = Item['snippet']['title'],
+            Video_Description = Item['snippet']['description'],
+            Tags = Item['snippet'].get('tags'),
+            PublishedAt = Parse_Timestamp(Item['snippet']['publishedAt']),
+            View_Count = Parse_Count(Item['statistics'].get('viewCount')),
+            Like_Count = Parse_Count(Item['statistics'].get('likeCount')),
+            Dislike_Count = Parse_Count(Item['statistics'].get('dislikeCount')),
+            Favorite_Count = Parse_Count(Item['statistics'].get('favoriteCount')),
+            Comment_Count = Parse_Count(Item['statistics'].get('commentCount')),
+            Duration = Parse_Duration(Item['contentDetails']['duration']),
+            Thumbnail = Item['snippet']['thumbnails']['default']['url'],
+            Caption_Status = Item['contentDetails']['caption'],
+            Playlist_ID = Playlist_Id,
+            Comments = Comments
+        )
+
+    @classmethod
+    def From_Document(cls, Document):
+        """Build the record from a stored video, whether its values were stored as strings or typed."""
+        Comments = []
+        for Comment in Document.get('Comments', []):
+            for comment in Comment.values():
+                record = CommentRecord.From_Document(comment)
+                if record is not None:
+                    Comments.append(record)
+        return cls(
+            Channel_ID = Document.get('Channel_ID'),
+            Video_Id = Document.get('Video_Id', ''),
+            Video_Name = Document.get('Video_Name', ''),
+            Video_Description = Document.get('Video_Description', ''),
+            Tags = Document.get('Tags'),
+            PublishedAt = Parse_Timestamp(Document.get('PublishedAt')),
+            View_Count = Parse_Count(Document.get('View_Count')),
+            Like_Count = Parse_Count(Document.get('Like_Count')),
+            Dislike_Count = Parse_Count(Document.get('Dislike_Count')),
+            Favorite_Count = Parse_Count(Document.get('Favorite_Count')),
+            Comment_Count = Parse_Count(Document.get('Comment_Count')),
+            Duration = Parse_Duration(Document.get('Duration')),
+            Thumbnail = Document.get('Thumbnail', ''),
+            Caption_Status = Document.get('Caption_Status', ''),
+            Playlist_ID = Document.get('Playlist_ID', ''),
+            Comments = Comments
+        )
+
+    def To_Document(self):
+        """
+        Stored layout of the video, unchanged from the dict based scraping:
+        comments are wrapped as {"Comment_Id_N": {...}} and numbered from 1.
+        """
+        Document = {slot: getattr(self, slot) for slot in self.__slots__ if slot != 'Comments'}
+        Document['Comments'] = [{"Comment_Id_" + str(count): comment.To_Document()}
+                                for count, comment in enumerate(self.Comments, 1)]
+        return Document
+
+
+def Video_Records_From_Document(Document):
+    """
+    Returns:
+    - Video records of a stored channel document ({"Video_Id_N": {...}} entries)
+    """
+    return [VideoRecord.From_Document(video) for video_data in Document.get('VideoDetails', []) for video in video_data.values()]
+
+
+def Video_Documents(Video_Records):
+    """
+    Returns:
+    - Stored layout of the video records ({"Video_Id_N": {...}} entries numbered from 1)
+    """
+    return [{"Video_Id_" + str(count): video.To_Document()} for count, video in enumerate(Video_Records, 1)]
+
+
 #___________________________Data Scraping___________________________#
+# Partial responses: only the fields read by the scraping functions (plus the etag used by the response cache)
+Field_Masks = {
+    'channels': 'etag,items(id,snippet(title,description,thumbnails/default/url),'
+                'contentDetails/relatedPlaylists/uploads,statistics(subscriberCount,viewCount))',
+    'playlistItems': 'etag,nextPageToken,items/contentDetails/videoId',
+    'videos': 'etag,items(id,snippet(channelId,title,description,tags,publishedAt,thumbnails/default/url),'
+              'contentDetails(duration,caption),statistics(viewCount,likeCount,dislikeCount,favoriteCount,commentCount))',
+    'playlists': 'etag,nextPageToken,items(id,snippet/title)',
+    'commentThreads': 'etag,nextPageToken,items/snippet/topLevelComment(id,snippet(textDisplay,authorDisplayName,publishedAt))'
+}
+
+
+def Api_Fields(Endpoint):
+    """
+    Field mask sent with the requests of the given endpoint.
+    Setting the YT_FIELD_MASKS environment variable to 0 requests the full responses (to compare payload sizes).
+
+    Returns:
+    - fields parameter of the endpoint, None for the full response
+    """
+    if os.environ.get('YT_FIELD_MASKS', '1') == '0':
+        return None
+    return Field_Masks.get(Endpoint)
+
 def Channel_Detail_Scraping(Youtube,Channel_Id):
     """
     Retrieve Channel information about the given YouTube channel using the YouTube Data API v3.
@@ -76,42 +910,139 @@ def Channel_Detail_Scraping(Youtube,Channel_Id):
     - Channel details of the given channel
     
     """
-    Channel_Response = Youtube.channels().list(
+    Channel_Response = Execute_Request(Youtube.channels().list(
                 part = 'id,snippet,contentDetails,statistics',
-                id = Channel_Id).execute()
-        
-    Channel_Details = dict(
-        Channel_Name = Channel_Response['items'][0]['snippet']['title'],
-        Channel_Id = Channel_Response['items'][0]['id'],
-        Subscription_Count = Channel_Response['items'][0]['statistics']['subscriberCount'],
-        Channel_Views = Channel_Response['items'][0]['statistics']['viewCount'],
-        Channel_Description = Channel_Response['items'][0]['snippet']['description'],
-        Playlist_Id = Channel_Response['items'][0]['contentDetails']['relatedPlaylists']['uploads'],
-        Thumbnail_URL = Channel_Response['items'][0]['snippet']['thumbnails']['default']['url']
+                id = Channel_Id,
+                fields = Api_Fields('channels')), 'channels')
+
+    if not Channel_Response.get('items'):
+        raise ValueError(f'Channel Id "{Channel_Id}" not found')
+    return Channel_Details_From_Item(Channel_Response['items'][0])
+
+
+def Channel_Details_From_Item(Item):
+    """
+    Build the Channel details from one item of a channels().list response.
+
+    Returns:
+    - Channel details of the given item
+    """
+    return dict(
+        Channel_Name = Item['snippet']['title'],
+        Channel_Id = Item['id'],
+        Subscription_Count = Item['statistics'].get('subscriberCount'),
+        Channel_Views = Item['statistics']['viewCount'],
+        Channel_Description = Item['snippet']['description'],
+        Playlist_Id = Item['contentDetails']['relatedPlaylists']['uploads'],
+        Thumbnail_URL = Item['snippet']['thumbnails']['default']['url']
     )
-    return Channel_Details
+
+
+def Parse_Channel_Input(Value):
+    """
+    Work out how an entered channel has to be looked up: Channel Id, @handle, legacy username
+    or a channel URL (youtube.com/channel/..., /@handle, /user/..., /c/...).
+    Custom /c/ URLs have no API lookup, they are tried as handle since most custom URLs match the handle.
+
+    Returns:
+    - (lookup type, value) where lookup type is 'id', 'handle' or 'username', None if the input is empty
+    """
+    Value = Value.strip()
+    if not Value:
+        return None
+    if re.match(r'^(https?://)?(www\.|m\.)?youtube\.com/', Value):
+        Path = [part for part in urlsplit(Value if '://' in Value else 'https://' + Value).path.split('/') if part]
+        if not Path:
+            return None
+        if Path[0].startswith('@'):
+            return 'handle', Path[0]
+        if len(Path) >= 2 and Path[0] == 'channel':
+            return 'id', Path[1]
+        if len(Path) >= 2 and Path[0] == 'user':
+            return 'username', Path[1]
+        if len(Path) >= 2 and Path[0] == 'c':
+            return 'handle', '@' + Path[1]
+        return 'handle', '@' + Path[0]
+    if re.match(r'^UC[0-9A-Za-z_-]{22}$', Value):
+        return 'id', Value
+    return 'handle', Value if Value.startswith('@') else '@' + Value
+
+
+def Resolve_Channels(Youtube,Channel_Inputs):
+    """
+    Resolve all the entered channels in the fewest channels().list calls:
+    Channel Ids are looked up 50 per call, handles and usernames one per call.
+
+    Returns:
+    - Dictionary of entered value -> Channel details of the resolved channels
+    - List of entered values which do not match any channel
+    """
+    Resolved = {}
+    Lookups = {'id': [], 'handle': [], 'username': []}
+    Invalid = []
+    for Value in Channel_Inputs:
+        Lookup = Parse_Channel_Input(Value)
+        if Lookup is None:
+            Invalid.append(Value)
+        else:
+            Lookups[Lookup[0]].append((Value, Lookup[1]))
+
+    for item in range(0, len(Lookups['id']), 50):
+        Batch = Lookups['id'][item:item + 50]
+        Channel_Response = Execute_Request(Youtube.channels().list(
+                    part = 'id,snippet,contentDetails,statistics',
+                    id = ','.join(Channel_Id for Value, Channel_Id in Batch),
+                    fields = Api_Fields('channels')), 'channels')
+        Found = {channel['id']: Channel_Details_From_Item(channel) for channel in Channel_Response.get('items', [])}
+        for Value, Channel_Id in Batch:
+            if Channel_Id in Found:
+                Resolved[Value] = Found[Channel_Id]
+            else:
+                Invalid.append(Value)
+
+    from googleapiclient.errors import HttpError
+
+    for Lookup_Type, Parameter in (('handle', 'forHandle'), ('username', 'forUsername')):
+        for Value, Name in Lookups[Lookup_Type]:
+            try:
+                Channel_Response = Execute_Request(Youtube.channels().list(
+                            part = 'id,snippet,contentDetails,statistics',
+                            fields = Api_Fields('channels'),
+                            **{Parameter: Name}), 'channels')
+            except HttpError as e:
+                print(f'An error occured while resolving the channel "{Value}": {e}')
+                Channel_Response = {}
+            if Channel_Response.get('items'):
+                Resolved[Value] = Channel_Details_From_Item(Channel_Response['items'][0])
+            else:
+                Invalid.append(Value)
+
+    return Resolved, Invalid
 
 
 
-def Video_Id_Scraping(Youtube,Channel_Id):
+def Video_Id_Scraping(Youtube,Channel_Id,Playlist_Id=None):
     """
     Retrieve Video Ids of the given YouTube channel.
+    Playlist_Id is the uploads playlist of the channel, looked up when not given.
 
     Returns:
     - Video Ids of the given channel
     
     """
     Video_Ids = []
-    Playlist_Id = Channel_Detail_Scraping(Youtube,Channel_Id)['Playlist_Id']
+    if Playlist_Id is None:
+        Playlist_Id = Channel_Detail_Scraping(Youtube,Channel_Id)['Playlist_Id']
     Next_Page_Token = None
     
     while True:
-        Play_list_Response = Youtube.playlistItems().list(playlistId=Playlist_Id,
-                                                       part = 'snippet',
+        Play_list_Response = Execute_Request(Youtube.playlistItems().list(playlistId=Playlist_Id,
+                                                       part = 'contentDetails',
                                                        maxResults = 50,
-                                                       pageToken = Next_Page_Token).execute()
+                                                       pageToken = Next_Page_Token,
+                                                       fields = Api_Fields('playlistItems')), 'playlistItems')
         for item in Play_list_Response['items']:
-            Video_Ids.append(item['snippet']['resourceId']['videoId'])
+            Video_Ids.append(item['contentDetails']['videoId'])
         Next_Page_Token = Play_list_Response.get('nextPageToken')
         
         if Next_Page_Token is None:
@@ -119,37 +1050,31 @@ def Video_Id_Scraping(Youtube,Channel_Id):
     return Video_Ids
 
 
-def Comment_Details_Scraping(Video_Ids):
+def Comment_Details_Scraping(Youtube,Video_Ids):
     """
     Retrieve Comments of the associated Videos in the given Youtube Channel.
 
+    Only a video with its comments disabled is skipped: quota exhaustion and the other API errors are raised,
+    so the harvest task fails and is retried instead of storing the video with comments missing.
+
     Returns:
-    - Comment details of the associated videos in given channel
+    - Comment records of the associated videos in given channel (empty when comments are disabled)
     
     """
     Comment_Details = []
-    count = 1
     
     try:
         Next_Page_Token = None 
         
         while True:
-            Comment_Response = Youtube.commentThreads().list(part = 'snippet',
+            Comment_Response = Execute_Request(Youtube.commentThreads().list(part = 'snippet',
                                                videoId = Video_Ids,
                                                maxResults=100,
-                                               pageToken = Next_Page_Token).execute()
+                                               pageToken = Next_Page_Token,
+                                               fields = Api_Fields('commentThreads')), 'commentThreads')
             
             for cmt in Comment_Response['items']:
-                comment = cmt['snippet']['topLevelComment']['snippet']
-                Comment_Detail = {"Comment_Id_" + str(count):{
-                    "Comment_Id": cmt['snippet']['topLevelComment']['id'],
-                    "Comment_Text": comment['textDisplay'],
-                    "Comment_Author": comment['authorDisplayName'],
-                    "Comment_PublishedAt": comment['publishedAt']
-                }
-                                  }
-                Comment_Details.append(Comment_Detail)
-                count = count + 1
+                Comment_Details.append(CommentRecord.From_Api_Item(cmt))
             Next_Page_Token = Comment_Response.get('nextPageToken')
 
             if not Next_Page_Token:
@@ -157,64 +1082,44 @@ def Comment_Details_Scraping(Video_Ids):
     
     except Exception as e:
     
-        if 'commentsDisabled' in str(e):
-            Comment_Details.append({"Comments":{}})
-        else:
-            st.error(f'An error occured while fetching the comments: {e}')
+        if 'commentsDisabled' not in Api_Error_Reasons(e):
+            raise
+        Record_Counter('comments_disabled_videos_total')
     
     return Comment_Details
 
 
 
-def Video_Details_Scraping(Youtube,Channel_Id,Video_Ids):
+def Video_Details_Scraping(Youtube,Channel_Id,Video_Ids,Playlist_Id=None):
     """
     Retrieve Videos of the given YouTube channel.
+    Playlist_Id is the uploads playlist of the channel, looked up when not given.
 
     Returns:
-    - Video details of the given channel
+    - Video records of the given channel
     
     """
     Video_Details = []
-    count = 1
+    if Playlist_Id is None:
+        Playlist_Id = Channel_Detail_Scraping(Youtube,Channel_Id)['Playlist_Id']
     
     for item in range(0, len(Video_Ids), 50):
-        Video_Response = Youtube.videos().list(
+        Video_Response = Execute_Request(Youtube.videos().list(
             id=','.join(Video_Ids[item:item + 50]),
-            part='snippet,contentDetails,statistics'
-        ).execute()
+            part='snippet,contentDetails,statistics',
+            fields=Api_Fields('videos')
+        ), 'videos')
         
         for video in Video_Response['items']:
-            playlist_id = Channel_Detail_Scraping(Youtube,Channel_Id)['Playlist_Id']  # Get the playlist ID from Channel Detail Scraping
-            
-            Video_Detail = {
-                "Video_Id_" + str(count): {
-                    "Channel_ID": video['snippet']['channelId'],
-                    "Video_Id": video['id'],
-                    "Video_Name": video['snippet']['title'],
-                    "Video_Description": video['snippet']['description'],
-                    "Tags": video['snippet'].get('tags'),
-                    "PublishedAt": video['snippet']['publishedAt'],
-                    "View_Count": video['statistics']['viewCount'],
-                    "Like_Count": video['statistics'].get('likeCount'),
-                    "Dislike_Count": video['statistics'].get('dislikeCount'),
-                    "Favorite_Count": video['statistics'].get('favoriteCount'),
-                    "Comment_Count": video['statistics'].get('commentCount'),
-                    "Duration": video['contentDetails']['duration'],
-                    "Thumbnail": video['snippet']['thumbnails']['default']['url'],
-                    "Caption_Status": video['contentDetails']['caption'],
-                    "Playlist_ID": playlist_id,  # Include Playlist ID
-                    "Comments": Comment_Details_Scraping(video['id'])
-                }
-            }
-            count += 1
-            Video_Details.append(Video_Detail)
+            Video_Details.append(VideoRecord.From_Api_Item(video, Playlist_Id, Comment_Details_Scraping(Youtube,video['id'])))
     
     return Video_Details
 
 
 def Playlist_Detail_Scraping(Youtube,Channel_Id):
     """
-    Retrieve Playlists of the given YouTube channel.
+    Retrieve Playlists of the given YouTube channel. API errors are raised, so the harvest task
+    fails and is retried instead of storing the channel with playlists missing.
     
     Returns:
     - Playlist detail of the given channel
@@ -222,30 +1127,40 @@ def Playlist_Detail_Scraping(Youtube,Channel_Id):
     Next_Page_Token = None
     PlaylistDetail = []
     
-    try:
-        while True:
-            Playlist_Response = Youtube.playlists().list(part = 'snippet,contentDetails,status',
-                                               channelId = Channel_Id,
-                                               maxResults=50,
-                                               pageToken = Next_Page_Token).execute()
-            for item in Playlist_Response['items']:
-                Playlists = dict(
-                    Playlist_Id = item['id'],
-                    Channel_Id = Channel_Id,
-                    Playlist_Name = item['snippet']['title']
-                )
-                PlaylistDetail.append(Playlists)
-            Next_Page_Token = Playlist_Response.get('nextPageToken')
-        
-            if not Next_Page_Token:
-                break
-    except Exception as e:
-        print(f'An error occured while fetching the playlists: {e}')
+    while True:
+        Playlist_Response = Execute_Request(Youtube.playlists().list(part = 'snippet',
+                                           channelId = Channel_Id,
+                                           maxResults=50,
+                                           pageToken = Next_Page_Token,
+                                           fields = Api_Fields('playlists')), 'playlists')
+        for item in Playlist_Response['items']:
+            Playlists = dict(
+                Playlist_Id = item['id'],
+                Channel_Id = Channel_Id,
+                Playlist_Name = item['snippet']['title']
+            )
+            PlaylistDetail.append(Playlists)
+        Next_Page_Token = Playlist_Response.get('nextPageToken')
+    
+        if not Next_Page_Token:
+            break
     return PlaylistDetail
 
 
 
 #___________________________Create MongoDB Connection___________________________#
+@st.cache_resource
+def Mongo_Client():
+    """
+    One MongoDB client (with its connection pool) per process, instead of a new client per call.
+
+    Returns:
+    - client (pymongo.MongoClient): The MongoDB client.
+    """
+    from pymongo import MongoClient
+
+    return MongoClient("mongodb://localhost:27017/")
+
 
 def Connect_To_MongoDB():
     """
@@ -255,13 +1170,13 @@ def Connect_To_MongoDB():
     - Collection (pymongo.collection.Collection): The MongoDB collection for storing channel details.
     """
     
-    client = MongoClient("mongodb://localhost:27017/")
+    client = Mongo_Client()
     Database = client['YouTubeScrapingMongoDB']
     Collection = Database['ChannelDetailsCollection']
     return Collection
 
 
-def Connect_To_TempdbMongoDB():
+def Connect_To_TempdbMongoDB(Run_Id=None):
     """
     Establishes a connection to the MongoDB server and retrieves the temporary collection for temporary storage.
 
@@ -269,158 +1184,582 @@ def Connect_To_TempdbMongoDB():
     - Collection_temp (pymongo.collection.Collection): The temporary MongoDB collection for temporary storage.
     """
     
-    client = MongoClient("mongodb://localhost:27017/")
-    temp_db = client['TemporaryDatabase']
-    Collection_temp = temp_db['TemporaryCollection']
-    return Collection_temp
+    return Temp_Collection('TemporaryCollection', Run_Id)
+
+
+def Temp_Collection(Name, Run_Id=None):
+    """
+    Every harvest run keeps its temporary data in its own collections (e.g. TemporaryCollection_<Run_Id>),
+    so runs of several users or machines never overwrite or drop each other's data.
+    Without a Run_Id the un-namespaced collections are used.
+
+    Returns:
+    - The temporary collection of the run
+    """
+    client = Mongo_Client()
+    return client['TemporaryDatabase'][f'{Name}_{Run_Id}' if Run_Id else Name]
+
+
+def New_Run_Id():
+    """
+    Returns:
+    - Id of a new harvest run, sortable by start time
+    """
+    return datetime.utcnow().strftime('%Y%m%d%H%M%S') + '_' + os.urandom(3).hex()
+
+
+def Temp_Run_Ids():
+    """
+    Returns:
+    - Ids of the harvest runs having data in the Temporary DB, latest first
+    """
+    client = Mongo_Client()
+    Prefix = 'TemporaryCollection_'
+    return sorted((name[len(Prefix):] for name in client['TemporaryDatabase'].list_collection_names()
+                   if name.startswith(Prefix)), reverse=True)
 
 
 #___________________________Insert/Update into MongoDB___________________________#
-def store_data_in_temp_db(ChannelDetails, VideoDetails):
+def Channel_Summary(ChannelDetails, VideoDetails):
+    """
+    Compact summary of a scraped channel, stored next to the full document so the results
+    can be displayed without reading every video and comment back.
+
+    Returns:
+    - Channel summary of the given channel
+    """
+    Comment_Count = sum(len(video.Comments) for video in VideoDetails)
+    return dict(
+        Channel_Name = ChannelDetails['Channel_Name'],
+        Subscription_Count = ChannelDetails['Subscription_Count'],
+        Channel_Views = ChannelDetails['Channel_Views'],
+        Video_Count = len(VideoDetails),
+        Comment_Count = Comment_Count,
+        Thumbnail_URL = ChannelDetails['Thumbnail_URL']
+    )
+
+
+def store_data_in_temp_db(ChannelDetails, VideoDetails, Run_Id=None):
     """
     Stores video details in temporary database before uploading them to the main database.
+    VideoDetails are the video records, stored in the {"Video_Id_N": {...}} document layout.
     
     """
     try:
-        Collection_temp = Connect_To_TempdbMongoDB()
+        ChannelSummary = Channel_Summary(ChannelDetails, VideoDetails)
+        VideoDetails = Video_Documents(VideoDetails)
+        Scraped_At = datetime.utcnow().replace(microsecond=0)  # Time of the statistics snapshot in MySQL
+        Collection_temp = Connect_To_TempdbMongoDB(Run_Id)
         existing_channel = Collection_temp.find_one({"ChannelDetails.Channel_Id": ChannelDetails["Channel_Id"]})
 
+        Record_Counter('mongo_ops_total', op='find_one', collection='TemporaryCollection')
+
         if existing_channel:
             query = {"ChannelDetails.Channel_Id": ChannelDetails["Channel_Id"]}
-            Collection_temp.replace_one(query, {"ChannelDetails": ChannelDetails, "VideoDetails": VideoDetails})
+            Collection_temp.replace_one(query, {"ChannelDetails": ChannelDetails, "ChannelSummary": ChannelSummary,
+                                                "Scraped_At": Scraped_At, "VideoDetails": VideoDetails})
+            Record_Counter('mongo_ops_total', op='replace_one', collection='TemporaryCollection')
         else:
-            new_document = {"ChannelDetails": ChannelDetails, "VideoDetails": VideoDetails}
+            new_document = {"ChannelDetails": ChannelDetails, "ChannelSummary": ChannelSummary,
+                            "Scraped_At": Scraped_At, "VideoDetails": VideoDetails}
             Collection_temp.insert_one(new_document)
+            Record_Counter('mongo_ops_total', op='insert_one', collection='TemporaryCollection')
     
     except Exception as e:
         print(f"An error occurred: {e}")
 
 
 
-def insert_playlist_details_to_mongodb(playlist_details):
-    client = MongoClient("mongodb://localhost:27017/")
-    temp_db = client['TemporaryDatabase']
-    Collection_playlist_insert = temp_db['PlaylistCollection']
+def insert_playlist_details_to_mongodb(playlist_details, Channel_Id=None, Run_Id=None):
+    Collection_playlist_insert = Temp_Collection('PlaylistCollection', Run_Id)
     
     try:
         playlist_insert_mongodb = {"PlaylistDetails": playlist_details}
-        Collection_playlist_insert.insert_one(playlist_insert_mongodb)
+        if Channel_Id:
+            # One document per channel, so scraping a channel again (e.g. a retried harvest task) replaces it
+            playlist_insert_mongodb['Channel_Id'] = Channel_Id
+            Collection_playlist_insert.replace_one({'Channel_Id': Channel_Id}, playlist_insert_mongodb, upsert=True)
+            Record_Counter('mongo_ops_total', op='replace_one', collection='PlaylistCollection')
+        else:
+            Collection_playlist_insert.insert_one(playlist_insert_mongodb)
+            Record_Counter('mongo_ops_total', op='insert_one', collection='PlaylistCollection')
         print("Playlist details inserted into MongoDB successfully.")
     except Exception as e:
         print(f'An error occurred while inserting playlist details into MongoDB: {e}')
 
         
         
-def Move_from_tempdb_to_mongodb():
+def Move_from_tempdb_to_mongodb(Run_Id=None):
+    
+    try:
+        temp_collection = Connect_To_TempdbMongoDB(Run_Id)
+        playlist_collection = Temp_Collection('PlaylistCollection', Run_Id)
+        final_collection = Connect_To_MongoDB()
+
+        # Retrieve documents from the temporary collection
+        documents_to_move = temp_collection.find()
+        # Move documents to the final destination collection
+        for document in documents_to_move:
+            channel_id = document['ChannelDetails']['Channel_Id']
+            with Stage_Timer('mongo_move_channel_seconds'):
+                # The playlists are kept with the channel, the temporary collections are dropped after the MySQL migration
+                document['PlaylistDetails'] = [playlist
+                                               for playlist_document in playlist_collection.find({'PlaylistDetails.Channel_Id': channel_id}, {'_id': 0})
+                                               for playlist in playlist_document.get('PlaylistDetails', [])
+                                               if playlist.get('Channel_Id') == channel_id]
+                Record_Counter('mongo_ops_total', op='find', collection='PlaylistCollection')
+                existing_channel = final_collection.find_one({"ChannelDetails.Channel_Id": channel_id})
+                Record_Counter('mongo_ops_total', op='find_one', collection='ChannelDetailsCollection')
+
+                if existing_channel:
+                    query = {"ChannelDetails.Channel_Id": channel_id}
+                    del document['_id']
+                    final_collection.update_one(query, {"$set": document})
+                    Record_Counter('mongo_ops_total', op='update_one', collection='ChannelDetailsCollection')
+                    st.write(f"Updated document for channel ID: {channel_id}")
+                else:
+                    final_collection.insert_one(document)
+                    Record_Counter('mongo_ops_total', op='insert_one', collection='ChannelDetailsCollection')
+                    st.write(f"Inserted new document for channel ID: {channel_id}")
+
+        st.write('Data inserted or updated successfully')
+    
+    except Exception as e:
+        print(f"An error occurred while moving data to the final destination database: {e}")
+        
+
+#___________________________Retrieve ChannelIDs stored in Temporary DB in MongoDB___________________________#
+def Channel_Namelist_In_TempDB_In_MongoDB(Run_Id=None):
+    channels = []
+    temp_collection = Connect_To_TempdbMongoDB(Run_Id)
+
+    documents_to_move = temp_collection.find()
+   
+    for document in documents_to_move:
+        channel_id = document['ChannelDetails']['Channel_Id']
+        channels.append(channel_id)
+    return channels
+
+
+
+
+#___________________________Clear Temporary DB in MongoDB___________________________#
+def Clear_TempDB_In_MongoDB(Run_Id=None):
+    """
+    Drop the temporary collections and harvest tasks of the run, leaving the other runs untouched.
+    Without a Run_Id the whole Temporary DB is dropped.
+    
+    """
+    try:
+        client = Mongo_Client()
+        if Run_Id is None:
+            client.drop_database('TemporaryDatabase')
+            print("Temporary database dropped successfully")
+            return
+        for Name in ('TemporaryCollection', 'PlaylistCollection', 'VideoBatchCollection'):
+            Temp_Collection(Name, Run_Id).drop()
+        Temp_Collection('HarvestTasks').delete_many({'Run_Id': Run_Id})
+        print(f"Temporary data of the run {Run_Id} dropped successfully")
+    except Exception as e:
+        print(f"An error occurred while dropping the temporary database: {e}")
+
+
+#___________________________Distributed Harvesting___________________________#
+# Task types, claimed in this order so channels in progress are finished before new ones are started
+Task_Priority = {'assemble': 0, 'videos': 1, 'channel': 2}
+
+
+def Harvest_Task_Collection():
+    """
+    Work queue shared by every process scraping into this MongoDB. Each task is claimed through a lease:
+    a worker owns it until Lease_Until and extends the lease while it works, and an expired lease
+    (crashed or stuck worker) makes the task claimable again.
+
+    Returns:
+    - The HarvestTasks collection
+    """
+    return Temp_Collection('HarvestTasks')
+
+
+def Harvest_Task(Run_Id, Task_Type, Channel_Id, **Payload):
+    Now = datetime.utcnow()
+    Key = f"{Run_Id or 'default'}:{Task_Type}:{Channel_Id}" + (f":{Payload['Batch']}" if 'Batch' in Payload else '')
+    return {'_id': Key, 'Run_Id': Run_Id, 'Type': Task_Type, 'Channel_Id': Channel_Id, 'Priority': Task_Priority[Task_Type],
+            'Status': 'pending', 'Owner': None, 'Lease_Until': Now, 'Attempts': 0, 'Created_At': Now, **Payload}
+
+
+def Enqueue_Tasks(Tasks, Replace=True):
+    """
+    Queue the tasks. With Replace any earlier task with the same id is replaced (the same channel queued again
+    in the run), otherwise it is kept as it is, whatever its status, so a task queued twice only runs once.
+    
+    """
+    if not Tasks:
+        return
+    from pymongo import ReplaceOne, UpdateOne
+
+    Harvest_Tasks = Harvest_Task_Collection()
+    Harvest_Tasks.create_index([('Status', 1), ('Priority', 1), ('Lease_Until', 1)])
+    Harvest_Tasks.create_index([('Run_Id', 1), ('Status', 1)])
+    Harvest_Tasks.create_index('Channel_Task')
+    if Replace:
+        Operations = [ReplaceOne({'_id': task['_id']}, task, upsert=True) for task in Tasks]
+    else:
+        Operations = [UpdateOne({'_id': task['_id']}, {'$setOnInsert': {key: value for key, value in task.items() if key != '_id'}},
+                                upsert=True) for task in Tasks]
+    Harvest_Tasks.bulk_write(Operations, ordered=False)
+    Record_Counter('mongo_ops_total', len(Tasks), op='replace_one' if Replace else 'update_one', collection='HarvestTasks')
+    Record_Counter('harvest_tasks_queued_total', len(Tasks))
+
+
+def Enqueue_Channels(Channels, Run_Id=None):
+    """
+    Queue one channel task per resolved channel.
+
+    Returns:
+    - Channel Ids of the queued channels, without duplicates
+    """
+    Channels = {ChannelDetails['Channel_Id']: ChannelDetails for ChannelDetails in Channels}
+    Enqueue_Tasks([Harvest_Task(Run_Id, 'channel', Channel_Id, ChannelDetails=ChannelDetails)
+                   for Channel_Id, ChannelDetails in Channels.items()])
+    return list(Channels)
+
+
+def Claim_Task(Worker_Id, Run_Id=None, All_Runs=False, Lease_Seconds=120):
+    """
+    Atomically lease the next claimable task: pending, or leased by a worker whose lease has expired.
+
+    Returns:
+    - The claimed task, None if no task can be claimed now
+    """
+    from pymongo import ReturnDocument
+
+    Now = datetime.utcnow()
+    Query = {'Status': {'$in': ['pending', 'leased']}, 'Lease_Until': {'$lte': Now}}
+    if not All_Runs:
+        Query['Run_Id'] = Run_Id
+    Task = Harvest_Task_Collection().find_one_and_update(
+        Query, {'$set': {'Status': 'leased', 'Owner': Worker_Id, 'Lease_Until': Now + timedelta(seconds=Lease_Seconds)},
+                '$inc': {'Attempts': 1}},
+        sort=[('Priority', 1), ('Lease_Until', 1)], return_document=ReturnDocument.AFTER)
+    Record_Counter('mongo_ops_total', op='find_one_and_update', collection='HarvestTasks')
+    if Task is not None:
+        Record_Counter('harvest_tasks_claimed_total', type=Task['Type'])
+    return Task
+
+
+def Finish_Task(Task, Worker_Id, Error=None, Max_Attempts=3):
+    """
+    Mark the leased task done, or on error make it claimable again after a backoff
+    until it has failed Max_Attempts times. Nothing is changed when the lease was lost to another worker.
+    
+    """
+    Now = datetime.utcnow()
+    if Error is None:
+        Update = {'Status': 'done', 'Finished_At': Now}
+    elif Task['Attempts'] >= Max_Attempts:
+        Update = {'Status': 'failed', 'Finished_At': Now, 'Error': str(Error)}
+    else:
+        Update = {'Status': 'pending', 'Lease_Until': Now + timedelta(seconds=5 * Task['Attempts']), 'Error': str(Error)}
+    Harvest_Task_Collection().update_one({'_id': Task['_id'], 'Owner': Worker_Id, 'Status': 'leased'}, {'$set': Update})
+    Record_Counter('harvest_tasks_finished_total', type=Task['Type'], status=Update['Status'])
+
+
+@contextmanager
+def Lease_Heartbeat(Task, Worker_Id, Lease_Seconds=120):
+    """
+    Extend the lease of the task every third of the lease duration while the enclosed block runs.
+    
+    """
+    Stop = threading.Event()
+
+    def Heartbeat():
+        while not Stop.wait(Lease_Seconds / 3):
+            Result = Harvest_Task_Collection().update_one(
+                {'_id': Task['_id'], 'Owner': Worker_Id, 'Status': 'leased'},
+                {'$set': {'Lease_Until': datetime.utcnow() + timedelta(seconds=Lease_Seconds)}})
+            if not Result.matched_count:
+                Record_Counter('harvest_leases_lost_total', type=Task['Type'])
+                return
+
+    Thread = threading.Thread(target=Heartbeat, daemon=True)
+    Thread.start()
+    try:
+        yield
+    finally:
+        Stop.set()
+        Thread.join()
+
+
+def Run_Channel_Task(Youtube, Task, Batch_Size=50):
+    """
+    List the videos and scrape the playlists of a channel, then split its videos into batch tasks.
+    
+    """
+    ChannelDetails = Task['ChannelDetails']
+    Channel_Id = ChannelDetails['Channel_Id']
+    with Stage_Timer('scrape_stage_seconds', stage='video_ids'):
+        VideoIds = Video_Id_Scraping(Youtube,Channel_Id,ChannelDetails['Playlist_Id'])
+    with Stage_Timer('scrape_stage_seconds', stage='playlists'):
+        playlist_details = Playlist_Detail_Scraping(Youtube,Channel_Id)
+        insert_playlist_details_to_mongodb(playlist_details, Channel_Id, Task['Run_Id'])
+
+    Batches = [VideoIds[start:start + Batch_Size] for start in range(0, len(VideoIds), Batch_Size)]
+    Temp_Collection('VideoBatchCollection', Task['Run_Id']).delete_many({'Channel_Id': Channel_Id})
+    # A channel scraped again (expired lease, or queued again in the run) starts over with new batch tasks
+    Harvest_Tasks = Harvest_Task_Collection()
+    Harvest_Tasks.delete_many({'Channel_Task': Task['_id']})
+    Harvest_Tasks.update_one({'_id': Task['_id']},
+                             {'$set': {'Batches': len(Batches), 'Batches_Done': [], 'Assemble_Queued': not Batches}})
+    Tasks = [Harvest_Task(Task['Run_Id'], 'videos', Channel_Id, Batch=index, Video_Ids=batch, Channel_Task=Task['_id'])
+             for index, batch in enumerate(Batches)]
+    if not Tasks:
+        Tasks = [Harvest_Task(Task['Run_Id'], 'assemble', Channel_Id, Channel_Task=Task['_id'])]
+    Enqueue_Tasks(Tasks, Replace=False)
+
+
+def Run_Videos_Task(Youtube, Task):
+    """
+    Scrape the details and comments of one batch of videos into the VideoBatchCollection of the run.
+    The worker finishing the last batch of the channel queues its assemble task, once per channel scrape.
     
+    """
+    from pymongo import ReturnDocument
+
+    Channel_Task = Harvest_Task_Collection().find_one({'_id': Task['Channel_Task']}, {'ChannelDetails': 1})
+    Playlist_Id = Channel_Task['ChannelDetails']['Playlist_Id']
+    with Stage_Timer('scrape_stage_seconds', stage='video_details'):
+        VideoDetails = Video_Details_Scraping(Youtube,Task['Channel_Id'],Task['Video_Ids'],Playlist_Id)
+    with Stage_Timer('scrape_stage_seconds', stage='store_temp_db'):
+        Temp_Collection('VideoBatchCollection', Task['Run_Id']).replace_one(
+            {'_id': Task['_id']},
+            {'Channel_Id': Task['Channel_Id'], 'Batch': Task['Batch'], 'Videos': [video.To_Document() for video in VideoDetails]},
+            upsert=True)
+        Record_Counter('mongo_ops_total', op='replace_one', collection='VideoBatchCollection')
+
+    # Batches are recorded as a set, so a batch scraped twice after an expired lease is only counted once
+    Channel_Task = Harvest_Task_Collection().find_one_and_update(
+        {'_id': Task['Channel_Task']}, {'$addToSet': {'Batches_Done': Task['Batch']}},
+        projection={'Batches': 1, 'Batches_Done': 1}, return_document=ReturnDocument.AFTER)
+    if len(Channel_Task['Batches_Done']) < Channel_Task['Batches']:
+        return
+    # Only the first worker to see every batch done queues the assemble task, a batch scraped again later does not
+    if not Harvest_Task_Collection().find_one_and_update({'_id': Task['Channel_Task'], 'Assemble_Queued': {'$ne': True}},
+                                                         {'$set': {'Assemble_Queued': True}}):
+        return
     try:
-        temp_collection = Connect_To_TempdbMongoDB()
-        final_collection = Connect_To_MongoDB()
-
-        # Retrieve documents from the temporary collection
-        documents_to_move = temp_collection.find()
-        # Move documents to the final destination collection
-        for document in documents_to_move:
-            channel_id = document['ChannelDetails']['Channel_Id']
-            existing_channel = final_collection.find_one({"ChannelDetails.Channel_Id": channel_id})
+        Enqueue_Tasks([Harvest_Task(Task['Run_Id'], 'assemble', Task['Channel_Id'], Channel_Task=Task['Channel_Task'])],
+                      Replace=False)
+    except Exception:
+        # Let the retry of this batch queue it
+        Harvest_Task_Collection().update_one({'_id': Task['Channel_Task']}, {'$set': {'Assemble_Queued': False}})
+        raise
 
-            if existing_channel:
-                query = {"ChannelDetails.Channel_Id": channel_id}
-                del document['_id']
-                final_collection.update_one(query, {"$set": document})
-                st.write(f"Updated document for channel ID: {channel_id}")
-            else:
-                final_collection.insert_one(document)
-                st.write(f"Inserted new document for channel ID: {channel_id}")
 
-        st.write('Data inserted or updated successfully')
+def Run_Assemble_Task(Task):
+    """
+    Join the video batches of a channel, in order, into its document in the Temporary DB of the run.
+    The batches are kept until the run is cleared, so an assemble task run again after an expired lease
+    builds the same document.
     
-    except Exception as e:
-        print(f"An error occurred while moving data to the final destination database: {e}")
-        
+    """
+    ChannelDetails = Harvest_Task_Collection().find_one({'_id': Task['Channel_Task']}, {'ChannelDetails': 1})['ChannelDetails']
+    Batches = Temp_Collection('VideoBatchCollection', Task['Run_Id'])
+    with Stage_Timer('scrape_stage_seconds', stage='store_temp_db'):
+        VideoDetails = [VideoRecord.From_Document(video)
+                        for batch in Batches.find({'Channel_Id': Task['Channel_Id']}).sort('Batch', 1)
+                        for video in batch['Videos']]
+        store_data_in_temp_db(ChannelDetails, VideoDetails, Task['Run_Id'])
+    Record_Counter('scraped_channels_total')
+    Record_Counter('scraped_videos_total', len(VideoDetails))
+
+
+def Run_Harvest_Worker(Youtube, Run_Id=None, All_Runs=False, Worker_Id=None, Lease_Seconds=120, Poll_Seconds=2, Wait=False):
+    """
+    Claim and run harvest tasks until the run (or every run, with All_Runs) has no pending or leased task left.
+    With Wait the worker keeps polling for new tasks instead of returning.
 
-#___________________________Retrieve ChannelIDs stored in Temporary DB in MongoDB___________________________#
-def Channel_Namelist_In_TempDB_In_MongoDB():
-    channels = []
-    client = MongoClient("mongodb://localhost:27017/")
-    temp_db = client['TemporaryDatabase']
-    temp_collection = temp_db['TemporaryCollection']
+    Returns:
+    - Number of tasks run by this worker
+    """
+    Worker_Id = Worker_Id or f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+    Handlers = {'channel': lambda task: Run_Channel_Task(Youtube, task),
+                'videos': lambda task: Run_Videos_Task(Youtube, task),
+                'assemble': Run_Assemble_Task}
+    Count = 0
+    while True:
+        Task = Claim_Task(Worker_Id, Run_Id, All_Runs, Lease_Seconds)
+        if Task is None:
+            Open = {'Status': {'$in': ['pending', 'leased']}}
+            if not All_Runs:
+                Open['Run_Id'] = Run_Id
+            if not Wait and not Harvest_Task_Collection().count_documents(Open):
+                return Count
+            time.sleep(Poll_Seconds)  # Other workers still hold leases, their tasks may queue more work
+            continue
+        Error = None
+        with Lease_Heartbeat(Task, Worker_Id, Lease_Seconds):
+            try:
+                with Stage_Timer('harvest_task_seconds', type=Task['Type']):
+                    Handlers[Task['Type']](Task)
+            except Exception as e:
+                Error = e
+                print(f"An error occurred while running the harvest task {Task['_id']}: {e}")
+        Finish_Task(Task, Worker_Id, Error)
+        Count += 1
 
-    documents_to_move = temp_collection.find()
-   
-    for document in documents_to_move:
-        channel_id = document['ChannelDetails']['Channel_Id']
-        channels.append(channel_id)
-    return channels
 
+def Run_Harvest_Workers(Youtube, Run_Id=None, Workers=1, **Options):
+    """
+    Run the harvest worker loop on Workers threads, which needs a thread safe client such as an API_Key_Pool
+    when Workers is above 1.
 
+    Returns:
+    - Number of tasks run
+    """
+    if Workers <= 1:
+        return Run_Harvest_Worker(Youtube, Run_Id, **Options)
 
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
-#___________________________Clear Temporary DB in MongoDB___________________________#
-def Clear_TempDB_In_MongoDB():
-    try:
-        client = MongoClient("mongodb://localhost:27017/")
-        client.drop_database('TemporaryDatabase')
-        print("Temporary database dropped successfully")
-    except Exception as e:
-        print(f"An error occurred while dropping the temporary database: {e}")
+    ctx = get_script_run_ctx()
+    with ThreadPoolExecutor(max_workers=Workers, initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx)) as executor:
+        return sum(executor.map(lambda _: Run_Profiled(Run_Harvest_Worker, Youtube, Run_Id, **Options), range(Workers)))
+
+
+def Failed_Channels(Run_Id=None):
+    """
+    Returns:
+    - Dictionary of Channel Id -> error of the channels having a failed harvest task in the run
+    """
+    return {task['Channel_Id']: task.get('Error') for task in
+            Harvest_Task_Collection().find({'Run_Id': Run_Id, 'Status': 'failed'}, {'Channel_Id': 1, 'Error': 1})}
 
 
-#___________________________Store the Scraped data into Temporary DB in MongoDB___________________________#
-def Main_Scraping(Youtube,_Unique,Channels_Id_List):
+def Main_Scraping(Youtube,_Unique,Channels_Id_List,Workers=1,Run_Id=None):
+    """
+    Scrape the entered channels into the Temporary DB of the run.
+    All channels are resolved up front, invalid Channel Id(s) are reported before scraping starts.
+    The channels are then queued as harvest tasks and scraped by Workers threads of this process, together
+    with the Harvest_Worker.py processes working on the same MongoDB.
 
+    Returns:
+    - Channel Ids of the scraped channels
+    """
     st.write(f'You have entered {len(Channels_Id_List)} channel Id(s)')
-    for Channel_Id in _Unique:
-        ChannelDetails = Channel_Detail_Scraping(Youtube,Channel_Id)
-        VideoIds = Video_Id_Scraping(Youtube,Channel_Id)
-        VideoDetails = Video_Details_Scraping(Youtube,Channel_Id,VideoIds)
-        playlist_details = Playlist_Detail_Scraping(Youtube,Channel_Id)
-        store_data_in_temp_db(ChannelDetails, VideoDetails)
-        insert_playlist_details_to_mongodb(playlist_details)
+    with Stage_Timer('scrape_stage_seconds', stage='channel_details'):
+        Resolved, Invalid = Resolve_Channels(Youtube,_Unique)
+    if Invalid:
+        st.warning(f'{len(Invalid)} Channel Id(s) could not be found and will be skipped: ' + ", ".join(Invalid))
+
+    # A channel entered both by Id and by handle is queued once
+    Channel_Ids = Enqueue_Channels(Resolved.values(), Run_Id)
+    Run_Harvest_Workers(Youtube, Run_Id, Workers)
+
+    Failed = Failed_Channels(Run_Id)
+    for Channel_Id, error in Failed.items():
+        st.error(f'An error occurred while scraping the channel {Channel_Id}: {error}')
+    return [Channel_Id for Channel_Id in Channel_Ids if Channel_Id not in Failed]
 
 
 #___________________________Display the Scraped Channel Details in Streamlit page___________________________
-def Channel_Scraping(_UniqueChannelIds):
+def Channel_Scraping(_UniqueChannelIds, Run_Id=None):
     count = 1
-    collection = Connect_To_TempdbMongoDB()
+    collection = Connect_To_TempdbMongoDB(Run_Id)
     st.write()
     st.divider()
     st.success(f'Successfully scraped {len(_UniqueChannelIds)} channel Id(s)')
     st.write()
+
+    # One query for all channels, reading only the summaries (never the videos and comments)
+    Summaries = {document['ChannelDetails']['Channel_Id']: document['ChannelSummary']
+                 for document in collection.find({'ChannelDetails.Channel_Id': {'$in': list(_UniqueChannelIds)}},
+                                                 {'_id': 0, 'ChannelDetails.Channel_Id': 1, 'ChannelSummary': 1})
+                 if 'ChannelSummary' in document}
+    Record_Counter('mongo_ops_total', op='find', collection='TemporaryCollection')
     
     for unqch in _UniqueChannelIds:
-        document_cursor = collection.find({'ChannelDetails.Channel_Id': unqch})
-        document = next(document_cursor, None)
+        summary = Summaries.get(unqch)
 
-        if document:
+        if summary:
             
-            channel_details = document['ChannelDetails']
-            video_details = document.get('VideoDetails',[])
-            channel_id = channel_details['Channel_Id']
-            channel_name = channel_details['Channel_Name']
-            channel_views = channel_details['Channel_Views']
-            subscription_count = channel_details['Subscription_Count']
-            thumbnail_url = channel_details['Thumbnail_URL']
+            channel_id = unqch
+            channel_name = summary['Channel_Name']
+            channel_views = summary['Channel_Views']
+            subscription_count = summary['Subscription_Count']
+            thumbnail_url = summary['Thumbnail_URL']
             
             st.write(f'<h3> <span style="color:#01aac8"><i><b> Channel : {count} </b></i></span></h3>', unsafe_allow_html=True)
             st.write(f'<b>Channel Name :</b> <span style="color:#c86401"><i><b>{channel_name}</b></i></span>', unsafe_allow_html=True)
             st.write(f'<b>Channel Id :</b> <span style="color:#c86401"><i><b>{channel_id}</b></i></span>', unsafe_allow_html=True)
             st.write(f'<b>Subscription Count :</b> <span style="color:#c86401"><i><b>{subscription_count}</b></i></span>', unsafe_allow_html=True)
             st.write(f'<b>Channel Views :</b> <span style="color:#c86401"><i><b>{channel_views}</b></i></span>', unsafe_allow_html=True)
-            st.write(f'<b>Video Count :</b> <span style="color:#c86401"><i><b>{len(video_details)}</b></i></span>', unsafe_allow_html=True)
+            st.write(f'<b>Video Count :</b> <span style="color:#c86401"><i><b>{summary["Video_Count"]}</b></i></span>', unsafe_allow_html=True)
+            st.write(f'<b>Comment Count :</b> <span style="color:#c86401"><i><b>{summary["Comment_Count"]}</b></i></span>', unsafe_allow_html=True)
             st.image(thumbnail_url, width=200)
             st.divider()
             count +=1
 
+#___________________________Data Conversion Helpers___________________________#
+def Parse_Duration(Duration):
+    """
+    Convert an ISO 8601 video duration (e.g. PT1H2M3S) into seconds.
+
+    Returns:
+    - Duration in seconds (0 if the duration is missing)
+    """
+    if isinstance(Duration, int):
+        return Duration  # Already stored in seconds
+    Units = {"D": 86400, "H": 3600, "M": 60, "S": 1}
+    return sum(int(x[:-1]) * Units[x[-1]] for x in re.findall(r'\d+[DHMS]', Duration or ''))
+
+
+def Parse_Timestamp(Value):
+    """
+    Convert a YouTube API timestamp (e.g. 2024-02-12T10:15:00Z) into datetime.
+
+    Returns:
+    - datetime of the given value, None if it cannot be parsed
+    """
+    if isinstance(Value, datetime):
+        return Value
+    try:
+        return datetime.strptime(Value, "%Y-%m-%dT%H:%M:%SZ")
+    except (TypeError, ValueError):
+        return None
+
+
+def Parse_Count(Value):
+    """
+    Convert a statistics count returned as string by the API into int.
+
+    Returns:
+    - int of the given value, None if the count is hidden or missing
+    """
+    try:
+        return int(Value)
+    except (TypeError, ValueError):
+        return None
+
+
 #___________________________Connection to MySQL___________________________#
+MySQL_Config = dict(
+    host='localhost',
+    user='root',
+    password='root',
+    database='youtubescrapingsql'
+)
+
+# ER_LOCK_DEADLOCK and ER_LOCK_WAIT_TIMEOUT: the channel transaction is rolled back and retried
+Retryable_MySQL_Errors = (1213, 1205)
+
+
 def connect_to_mysql():
+    import mysql.connector
+    from mysql.connector import errorcode
+
     try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            user='root',
-            password='root',
-            database='youtubescrapingsql'
-        )
+        connection = mysql.connector.connect(**MySQL_Config)
         return connection
     except mysql.connector.Error as err:
         if err.errno == errorcode.ER_ACCESS_DENIED_ERROR:
@@ -431,24 +1770,43 @@ def connect_to_mysql():
             st.error(f"Error: {err}")
     
     
+def MySQL_Connection_Pool(Pool_Size):
+    """
+    Pool of MySQL connections of one migration, shared by its workers (mysql.connector allows up to 32).
+    Every migration gets its own pool, so migrations started from several sessions never exhaust each other's.
+
+    Returns:
+    - pool (mysql.connector.pooling.MySQLConnectionPool): The connection pool.
+    """
+    from mysql.connector import pooling
+
+    return pooling.MySQLConnectionPool(pool_name=f'youtube_migration_{os.urandom(4).hex()}', pool_size=Pool_Size, **MySQL_Config)
+
+
+def Is_Retryable_MySQL_Error(Error):
+    return getattr(Error, 'errno', None) in Retryable_MySQL_Errors
+    
+    
 #___________________________Insert/Update into MySQL from MongoDB___________________________#
-def insert_or_update_mysql(collection,Channel_Id):
+def insert_or_update_mysql(collection,Channel_Id,mysql_connection=None,Run_Id=None):
     """
     Insert/Update the documents from mongodb to mysql as table.
     If data is already present in MySQL then update it otherwise insert data.
+    Rows are written parents first (Channel, playlist, video, comment) in one transaction per channel.
+    Deadlock and lock wait timeout errors are raised so the caller can retry the channel.
     
     """
-    mysql_connection = connect_to_mysql()
+    Own_Connection = mysql_connection is None
+    if Own_Connection:
+        mysql_connection = connect_to_mysql()
     cursor = mysql_connection.cursor()
     document_cursor = collection.find({'ChannelDetails.Channel_Id': Channel_Id})
     document = next(document_cursor, None)
-    count = 1
-    CmtCount = 1
 
     if document:
         
         channel_details = document['ChannelDetails']
-        video_details = document.get('VideoDetails',[])
+        video_details = Video_Records_From_Document(document)
         channel_id = channel_details['Channel_Id']
         channel_name = channel_details['Channel_Name']
         channel_type = 'Channel Type'
@@ -464,31 +1822,40 @@ def insert_or_update_mysql(collection,Channel_Id):
                             channel_description = VALUES(channel_description)
                         """,
                        (channel_id, channel_name, channel_type, channel_views, channel_description, channel_status))
-        
+        Record_Counter('mysql_rows_total', table='Channel')
+
+        Collection_playlist = Temp_Collection('PlaylistCollection', Run_Id)
+        document_cursor = Collection_playlist.find({'PlaylistDetails.Channel_Id': channel_id},{'_id':0})
+
+        for playlist_document in document_cursor:
+            playlist_details = playlist_document.get('PlaylistDetails',[])
+            for playlist in playlist_details:
+                if playlist.get('Channel_Id', '') != channel_id:
+                    continue
+                playlist_id = playlist.get('Playlist_Id', '')
+                playlist_name = playlist.get('Playlist_Name', '')
 
+                cursor.execute("""INSERT INTO playlist (playlist_id, channel_id, playlist_name)
+                    VALUES (%s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                    playlist_name = VALUES(playlist_name)
+                    """,
+                    (playlist_id, channel_id, playlist_name))
+                Record_Counter('mysql_rows_total', table='playlist')
     
-        for video_data in video_details:
-                Video_Id_ = 'Video_Id_' + str(count)
-                count += 1
-                CmtCount = 1
-                
-                video_id = video_data.get(Video_Id_,{}).get('Video_Id','')
-                playlist_id = video_data.get(Video_Id_,{}).get('Playlist_ID','')
-                video_name = video_data.get(Video_Id_,{}).get('Video_Name','')
-                video_description = video_data.get(Video_Id_,{}).get('Video_Description','')
-                try:
-                    published_date = datetime.strptime(video_data.get(Video_Id_,{}).get('PublishedAt',''), "%Y-%m-%dT%H:%M:%SZ")
-                except:
-                    published_date = None
-                view_count = int(video_data.get(Video_Id_,{}).get('View_Count',0))
-                like_count = int(video_data.get(Video_Id_,{}).get('Like_Count',0))
-                dislike_count = 0 if video_data.get(Video_Id_,{}).get('Dislike_Count','0') is None else int(video_data.get(Video_Id_, {}).get('Dislike_Count'))
-                favorite_count = int(video_data.get(Video_Id_,{}).get('Favorite_Count',0))
-                comment_count = int(video_data.get(Video_Id_,{}).get('Comment_Count',0))
-                duration = sum(int(x[:-1]) * {"H": 3600, "M": 60, "S": 1}[x[-1]] for x in re.findall(r'\d+H|\d+M|\d+S', video_data.get(Video_Id_,{}).get('Duration','')))
-                thumbnail = video_data.get(Video_Id_,{}).get('Thumbnail','')
-                caption_status = video_data.get(Video_Id_,{}).get('Caption_Status','')
-                Comments = video_data.get(Video_Id_,{}).get('Comments',[])
+        for video in video_details:
+                video_id = video.Video_Id
+                video_name = video.Video_Name
+                video_description = video.Video_Description
+                published_date = video.PublishedAt
+                view_count = video.View_Count or 0
+                like_count = video.Like_Count or 0
+                dislike_count = video.Dislike_Count or 0
+                favorite_count = video.Favorite_Count or 0
+                comment_count = video.Comment_Count or 0
+                duration = video.Duration
+                thumbnail = video.Thumbnail
+                caption_status = video.Caption_Status
 
                 try:
                     cursor.execute("""INSERT INTO video (video_id, playlist_id, video_name, video_description, 
@@ -511,23 +1878,19 @@ def insert_or_update_mysql(collection,Channel_Id):
                                     (video_id, channel_id, video_name, video_description, published_date,
                                      view_count, like_count, dislike_count, favorite_count, comment_count,
                                      duration, thumbnail, caption_status))
+                    Record_Counter('mysql_rows_total', table='video')
                 except Exception as e:
+                    if Is_Retryable_MySQL_Error(e):
+                        raise
                     st.error(f"An error occurred while inserting/updating video: {e}")
 
                     
 
-                for Comment in Comments:
-                    Comment_Id_ = 'Comment_Id_' + str(CmtCount)
-                    CmtCount += 1
-                    
-                    comment_id = Comment.get(Comment_Id_,{}).get('Comment_Id','')
-                    video_id = video_data.get(Video_Id_,{}).get('Video_Id','')
-                    comment_text = Comment.get(Comment_Id_,{}).get('Comment_Text','')
-                    comment_author = Comment.get(Comment_Id_,{}).get('Comment_Author','')
-                    try:
-                        comment_published_date = datetime.strptime(Comment.get(Comment_Id_,{}).get('Comment_PublishedAt',''), "%Y-%m-%dT%H:%M:%SZ")
-                    except:
-                        comment_published_date = None
+                for comment in video.Comments:
+                    comment_id = comment.Comment_Id
+                    comment_text = comment.Comment_Text
+                    comment_author = comment.Comment_Author
+                    comment_published_date = comment.Comment_PublishedAt
                     try:
                         cursor.execute("""INSERT INTO comment (comment_id, video_id, comment_text, comment_author, 
                                                             comment_published_date)
@@ -538,35 +1901,447 @@ def insert_or_update_mysql(collection,Channel_Id):
                                             comment_published_date = VALUES(comment_published_date)
                                         """,
                                         (comment_id, video_id, comment_text, comment_author, comment_published_date))
+                        Record_Counter('mysql_rows_total', table='comment')
                     except Exception as e:
+                        if Is_Retryable_MySQL_Error(e):
+                            raise
                         st.error(f"An error occurred while inserting/updating Comments: {e}")
 
-        client = MongoClient("mongodb://localhost:27017/")
-        temp_db = client['TemporaryDatabase']
-        Collection_playlist = temp_db['PlaylistCollection']
-        document_cursor = Collection_playlist.find({},{'_id':0})
+        try:
+            Append_Statistics_Snapshots(cursor, channel_id, video_details,
+                                        document.get('Scraped_At') or datetime.utcnow().replace(microsecond=0))
+        except Exception as e:
+            if Is_Retryable_MySQL_Error(e):
+                raise
+            st.error(f"An error occurred while appending the statistics snapshots: {e}")
+
+        with Stage_Timer('mysql_batch_commit_seconds'):
+            mysql_connection.commit()
+        st.success(f'Successfully inserted or updated the "{channel_name}" channel into mysql')
+    cursor.close()
+    if Own_Connection:
+        mysql_connection.close()
 
-        for document in document_cursor:
-            playlist_details = document.get('PlaylistDetails',[])
-            for playlist in playlist_details:
-                playlist_id = playlist.get('Playlist_Id', '')
-                channel_id = playlist.get('Channel_Id', '')
-                playlist_name = playlist.get('Playlist_Name', '')
 
-                cursor.execute("""INSERT INTO playlist (playlist_id, channel_id, playlist_name)
-                    VALUES (%s, %s, %s)
-                    ON DUPLICATE KEY UPDATE
-                    playlist_name = VALUES(playlist_name)
-                    """,
-                    (playlist_id, channel_id, playlist_name))
-        mysql_connection.commit()
-        st.success('Successfully inserted or updated into mysql')
-        cursor.close()
-        mysql_connection.close()
+def Migrate_Channel_With_Retry(collection,Channel_Id,Pool,Max_Attempts=5,Run_Id=None):
+    """
+    Migrate one channel on a pooled connection, retrying the whole channel transaction
+    (with exponential backoff and jitter) on deadlock or lock wait timeout.
+
+    Returns:
+    - Number of attempts needed
+    """
+    for Attempt in range(1, Max_Attempts + 1):
+        mysql_connection = Pool.get_connection()
+        try:
+            with Stage_Timer('mysql_channel_migration_seconds'):
+                insert_or_update_mysql(collection, Channel_Id, mysql_connection, Run_Id)
+            return Attempt
+        except Exception as e:
+            mysql_connection.rollback()
+            if not Is_Retryable_MySQL_Error(e) or Attempt == Max_Attempts:
+                raise
+            Record_Counter('mysql_retries_total', errno=str(e.errno))
+            time.sleep(min(0.1 * 2 ** Attempt, 5) * random.uniform(0.5, 1.5))
+        finally:
+            mysql_connection.close()  # Returns the connection to the pool
+
+
+def Migrate_Channels_To_MySQL(collection,Channel_Ids,Workers=4,Run_Id=None):
+    """
+    Spread the channels across a pool of worker connections, one channel transaction per worker at a time.
+
+    Returns:
+    - Dictionary of Channel Id -> error message for the channels which could not be migrated
+    """
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+    Workers = max(1, min(Workers, 32, len(Channel_Ids) or 1))
+    Pool = MySQL_Connection_Pool(Workers)
+    ctx = get_script_run_ctx()
+    Failed = {}
+
+    # Worker threads write into the same Streamlit page as the main script
+    try:
+        with ThreadPoolExecutor(max_workers=Workers, initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx)) as executor:
+            Futures = {executor.submit(Run_Profiled, Migrate_Channel_With_Retry, collection, Channel_Id, Pool, Run_Id=Run_Id): Channel_Id
+                       for Channel_Id in Channel_Ids}
+            for future in as_completed(Futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    Failed[Futures[future]] = str(e)
+    finally:
+        Pool._remove_connections()  # Close the idle connections of the pool, mysql.connector has no public close
+    return Failed
         
 
+#___________________________Video Statistics Snapshots___________________________#
+# Snapshots older than this are deleted (YT_SNAPSHOT_RETENTION_DAYS, unset keeps them all, downsampled)
+Snapshot_Retention_Days = int(os.environ.get('YT_SNAPSHOT_RETENTION_DAYS', 0)) or None
+
+
+def Ensure_Snapshot_Table(connection):
+    """
+    Create the video_statistics_snapshot table (also in Youtube_Harvesting.sql) when the database predates it.
+    
+    """
+    cursor = connection.cursor()
+    cursor.execute("""CREATE TABLE IF NOT EXISTS video_statistics_snapshot (
+                        video_id varchar(64),
+                        snapshot_time datetime,
+                        view_count bigint,
+                        like_count bigint,
+                        comment_count bigint,
+                        primary key (video_id, snapshot_time)
+                      )
+                      PARTITION BY RANGE (YEAR(snapshot_time)) (
+                        PARTITION p2024 VALUES LESS THAN (2025),
+                        PARTITION p2025 VALUES LESS THAN (2026),
+                        PARTITION p2026 VALUES LESS THAN (2027),
+                        PARTITION pmax VALUES LESS THAN MAXVALUE
+                      )""")
+    cursor.close()
+
+
+def Append_Statistics_Snapshots(cursor, Channel_Id, Video_Records, Snapshot_Time):
+    """
+    Append one (video_id, time, views, likes, comments) row per video whose statistics changed since
+    its latest snapshot. Unchanged videos add nothing: a snapshot holds until the next one.
+    
+    """
+    cursor.execute("""SELECT S.video_id, S.view_count, S.like_count, S.comment_count
+                      FROM video_statistics_snapshot S
+                      JOIN (SELECT SS.video_id, MAX(SS.snapshot_time) AS latest_time
+                            FROM video_statistics_snapshot SS JOIN video V ON SS.video_id = V.video_id
+                            WHERE V.playlist_id = %s GROUP BY SS.video_id) L
+                      ON S.video_id = L.video_id AND S.snapshot_time = L.latest_time""", (Channel_Id,))
+    Latest = {video_id: (views, likes, comments) for video_id, views, likes, comments in cursor.fetchall()}
+
+    Rows = [(video.Video_Id, Snapshot_Time, video.View_Count or 0, video.Like_Count or 0, video.Comment_Count or 0)
+            for video in Video_Records
+            if Latest.get(video.Video_Id) != (video.View_Count or 0, video.Like_Count or 0, video.Comment_Count or 0)]
+    if Rows:
+        cursor.executemany("""INSERT IGNORE INTO video_statistics_snapshot
+                              (video_id, snapshot_time, view_count, like_count, comment_count)
+                              VALUES (%s, %s, %s, %s, %s)""", Rows)
+        Record_Counter('mysql_rows_total', len(Rows), table='video_statistics_snapshot')
+
+
+def Maintain_Snapshot_Partitions(connection, Retention_Days=None, Years_Ahead=1):
+    """
+    Keep one partition per year on video_statistics_snapshot: split the coming years out of pmax before
+    their data arrives, and drop the yearly partitions entirely older than Retention_Days
+    (dropping a partition is far cheaper than deleting its rows). A partition still holding the latest
+    snapshot of a video before the cutoff is kept: that snapshot holds until the next one, and
+    Downsample_Statistics_Snapshots deletes the other rows of the partition.
+
+    Returns:
+    - Names of the partitions added and dropped
+    """
+    cursor = connection.cursor()
+    cursor.execute("""SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS
+                      WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'video_statistics_snapshot'
+                      AND PARTITION_NAME IS NOT NULL""")
+    Years = {name: int(bound) - 1 for name, bound in cursor.fetchall() if bound != 'MAXVALUE'}
+    Changed = []
+    if Years:
+        New_Years = list(range(max(Years.values()) + 1, datetime.utcnow().year + Years_Ahead + 1))
+        if New_Years:
+            Partitions = ', '.join(f'PARTITION p{year} VALUES LESS THAN ({year + 1})' for year in New_Years)
+            cursor.execute(f"""ALTER TABLE video_statistics_snapshot REORGANIZE PARTITION pmax INTO
+                               ({Partitions}, PARTITION pmax VALUES LESS THAN MAXVALUE)""")
+            Changed += [f'p{year}' for year in New_Years]
+        if Retention_Days:
+            Cutoff = datetime.utcnow() - timedelta(days=Retention_Days)
+            cursor.execute("""SELECT DISTINCT YEAR(keep_time) FROM
+                                (SELECT MAX(snapshot_time) AS keep_time FROM video_statistics_snapshot
+                                 WHERE snapshot_time < %s GROUP BY video_id) K""", (Cutoff,))
+            Kept_Years = {year for (year,) in cursor.fetchall()}
+            Expired = [name for name, year in Years.items() if year < Cutoff.year and year not in Kept_Years]
+            if Expired:
+                cursor.execute(f"ALTER TABLE video_statistics_snapshot DROP PARTITION {', '.join(Expired)}")
+                Changed += Expired
+    cursor.close()
+    return Changed
+
+
+def Downsample_Statistics_Snapshots(connection, Raw_Days=30, Daily_Days=365, Retention_Days=None):
+    """
+    Keep every snapshot of the last Raw_Days, the last snapshot per video and day up to Daily_Days,
+    and the last snapshot per video and month beyond that. Snapshots older than Retention_Days are deleted,
+    except the latest one of each video before the cutoff: snapshots are only appended when the statistics
+    change, so it is still the video's current value, or the baseline of Video_Growth_Rates.
+
+    Returns:
+    - Number of snapshots deleted
+    """
+    Now = datetime.utcnow()
+    cursor = connection.cursor()
+    Deleted = 0
+    for Bucket, Days in (('DATE(snapshot_time)', Raw_Days), ('EXTRACT(YEAR_MONTH FROM snapshot_time)', Daily_Days)):
+        Cutoff = Now - timedelta(days=Days)
+        cursor.execute(f"""DELETE S FROM video_statistics_snapshot S
+                           JOIN (SELECT video_id, {Bucket} AS bucket, MAX(snapshot_time) AS keep_time
+                                 FROM video_statistics_snapshot WHERE snapshot_time < %s
+                                 GROUP BY video_id, {Bucket}) K
+                           ON S.video_id = K.video_id AND {Bucket.replace('snapshot_time', 'S.snapshot_time')} = K.bucket
+                           WHERE S.snapshot_time < %s AND S.snapshot_time < K.keep_time""", (Cutoff, Cutoff))
+        Deleted += cursor.rowcount
+    if Retention_Days:
+        cursor.execute("""DELETE S FROM video_statistics_snapshot S
+                          JOIN (SELECT video_id, MAX(snapshot_time) AS keep_time
+                                FROM video_statistics_snapshot WHERE snapshot_time < %s
+                                GROUP BY video_id) K
+                          ON S.video_id = K.video_id
+                          WHERE S.snapshot_time < K.keep_time""", (Now - timedelta(days=Retention_Days),))
+        Deleted += cursor.rowcount
+    connection.commit()
+    cursor.close()
+    return Deleted
+
+
+def Video_Growth_Rates(Days=30, Channel_Id=None, Limit=50):
+    """
+    Growth of views, likes and comments per video over the last Days. Snapshots are only appended on change,
+    so the baseline is the latest snapshot at or before the start of the window (the first snapshot for a video
+    first seen inside the window) and the rate is per day since the later of the two.
+
+    Returns:
+    - DataFrame of the fastest growing videos, by views per day
+    """
+    import pandas as pd
+
+    connection = connect_to_mysql()
+    cursor = connection.cursor()
+    query = """
+    select C.channel_name As 'Channel Name', V.video_name As 'Video Name',
+    L.view_count - F.view_count As 'Views Gained', L.like_count - F.like_count As 'Likes Gained',
+    L.comment_count - F.comment_count As 'Comments Gained',
+    round((L.view_count - F.view_count) / nullif(timestampdiff(second, greatest(F.snapshot_time, %s), %s) / 86400, 0), 1) As 'Views Per Day'
+    from (select video_id,
+                 coalesce(max(case when snapshot_time <= %s then snapshot_time end), min(snapshot_time)) As first_time,
+                 max(snapshot_time) As last_time
+          from video_statistics_snapshot group by video_id having max(snapshot_time) > %s) W
+    join video_statistics_snapshot F on F.video_id = W.video_id and F.snapshot_time = W.first_time
+    join video_statistics_snapshot L on L.video_id = W.video_id and L.snapshot_time = W.last_time
+    join video V on V.video_id = W.video_id left join Channel C on V.playlist_id = C.channel_id
+    where W.first_time < W.last_time and (%s is null or V.playlist_id = %s)
+    order by 6 desc limit %s;
+    """
+    Now = datetime.utcnow()
+    Start = Now - timedelta(days=Days)
+    cursor.execute(query, (Start, Now, Start, Start, Channel_Id, Channel_Id, Limit))
+    records = cursor.fetchall()
+    df = pd.DataFrame(records, columns=['Channel Name', 'Video Name', 'Views Gained', 'Likes Gained',
+                                        'Comments Gained', 'Views Per Day'])
+    cursor.close()
+    connection.close()
+    return df
+
+
+def Video_Statistics_History(Video_Id):
+    """
+    Returns:
+    - DataFrame of the statistics snapshots of the given video, oldest first
+    """
+    import pandas as pd
+
+    connection = connect_to_mysql()
+    cursor = connection.cursor()
+    cursor.execute("""select snapshot_time, view_count, like_count, comment_count from video_statistics_snapshot
+                      where video_id = %s order by snapshot_time""", (Video_Id,))
+    records = cursor.fetchall()
+    df = pd.DataFrame(records, columns=['Snapshot Time', 'View Count', 'Like Count', 'Comment Count'])
+    cursor.close()
+    connection.close()
+    return df
+
+
+#___________________________Export MongoDB data to Parquet___________________________#
+def Parquet_Schemas():
+    """
+    Typed column layout of every table written by Export_To_Parquet.
+    Tables without an id column are snapshot tables: every export appends one row per entity,
+    keyed by its id and Exported_At.
+
+    Returns:
+    - Dictionary of table name -> (pyarrow schema, id column, partition columns)
+    """
+    import pyarrow as pa
+
+    Timestamp = pa.timestamp('s', tz='UTC')
+    return {
+        'channels': (pa.schema([
+            ('Channel_Id', pa.string()),
+            ('Channel_Name', pa.string()),
+            ('Subscription_Count', pa.int64()),
+            ('Channel_Views', pa.int64()),
+            ('Channel_Description', pa.string()),
+            ('Playlist_Id', pa.string()),
+            ('Thumbnail_URL', pa.string()),
+            ('Exported_At', Timestamp)
+        ]), None, ['Channel_Id']),
+        'playlists': (pa.schema([
+            ('Playlist_Id', pa.string()),
+            ('Channel_Id', pa.string()),
+            ('Playlist_Name', pa.string())
+        ]), 'Playlist_Id', ['Channel_Id']),
+        'videos': (pa.schema([
+            ('Video_Id', pa.string()),
+            ('Channel_Id', pa.string()),
+            ('Playlist_Id', pa.string()),
+            ('Video_Name', pa.string()),
+            ('Video_Description', pa.string()),
+            ('Tags', pa.list_(pa.string())),
+            ('Published_At', Timestamp),
+            ('View_Count', pa.int64()),
+            ('Like_Count', pa.int64()),
+            ('Dislike_Count', pa.int64()),
+            ('Favorite_Count', pa.int64()),
+            ('Comment_Count', pa.int64()),
+            ('Duration_Seconds', pa.int64()),
+            ('Thumbnail', pa.string()),
+            ('Caption_Status', pa.string()),
+            ('Publish_Month', pa.string())
+        ]), 'Video_Id', ['Channel_Id', 'Publish_Month']),
+        'comments': (pa.schema([
+            ('Comment_Id', pa.string()),
+            ('Video_Id', pa.string()),
+            ('Channel_Id', pa.string()),
+            ('Comment_Text', pa.string()),
+            ('Comment_Author', pa.string()),
+            ('Comment_Published_At', Timestamp),
+            ('Publish_Month', pa.string())
+        ]), 'Comment_Id', ['Channel_Id', 'Publish_Month'])
+    }
+
+
+def Exported_Ids(Table_Path, Id_Column):
+    """
+    Read only the id column of an already exported table, so incremental exports skip known rows.
+    An unreadable table stops the export, as every row would otherwise be exported again.
+
+    Returns:
+    - Set of ids already present in the table
+    """
+    import pyarrow.parquet as pq
+
+    if not os.path.isdir(Table_Path):
+        return set()
+    try:
+        return set(pq.read_table(Table_Path, columns=[Id_Column]).column(Id_Column).to_pylist())
+    except Exception as e:
+        raise RuntimeError(f'Could not read the exported ids from {Table_Path}, the export was stopped to avoid duplicate rows: {e}') from e
+
+
+def Export_To_Parquet(Output_Dir, Channel_Ids=None, Batch_Size=10000):
+    """
+    Stream the channels, playlists, videos and comments from MongoDB into partitioned Parquet files.
+    Videos and comments are partitioned by channel and publish month, channels and playlists by channel.
+    Playlists, videos and comments already exported are skipped, so repeated exports only append new rows.
+    Channels are a snapshot table: each export appends the current counts of every channel with its Exported_At.
+
+    Returns:
+    - Number of rows exported per table
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    Schemas = Parquet_Schemas()
+    Run_Tag = datetime.utcnow().strftime('%Y%m%d%H%M%S%f')
+    Known_Ids = {table: Exported_Ids(os.path.join(Output_Dir, table), id_column) if id_column else set()
+                 for table, (schema, id_column, partitions) in Schemas.items()}
+    Buffers = {table: [] for table in Schemas}
+    Exported = {table: 0 for table in Schemas}
+
+    def Add_Row(Table, Row):
+        Id_Column = Schemas[Table][1]
+        if Id_Column:
+            if Row[Id_Column] in Known_Ids[Table]:
+                return
+            Known_Ids[Table].add(Row[Id_Column])
+        Buffers[Table].append(Row)
+        if len(Buffers[Table]) >= Batch_Size:
+            Flush(Table)
+
+    def Flush(Table):
+        if not Buffers[Table]:
+            return
+        Schema, Id_Column, Partitions = Schemas[Table]
+        pq.write_to_dataset(pa.Table.from_pylist(Buffers[Table], schema=Schema),
+                            root_path=os.path.join(Output_Dir, Table),
+                            partition_cols=Partitions,
+                            basename_template=f'part-{Run_Tag}-{Exported[Table]}-{{i}}.parquet',
+                            existing_data_behavior='overwrite_or_ignore')
+        Exported[Table] += len(Buffers[Table])
+        Buffers[Table] = []
+
+    query = {'ChannelDetails.Channel_Id': {'$in': list(Channel_Ids)}} if Channel_Ids else {}
+    Exported_At = datetime.utcnow()
+
+    # One channel document is held in memory at a time
+    for document in Connect_To_MongoDB().find(query, {'_id': 0}, batch_size=1):
+        channel_details = document['ChannelDetails']
+        channel_id = channel_details['Channel_Id']
+        Add_Row('channels', dict(
+            Channel_Id = channel_id,
+            Channel_Name = channel_details.get('Channel_Name'),
+            Subscription_Count = Parse_Count(channel_details.get('Subscription_Count')),
+            Channel_Views = Parse_Count(channel_details.get('Channel_Views')),
+            Channel_Description = channel_details.get('Channel_Description'),
+            Playlist_Id = channel_details.get('Playlist_Id'),
+            Thumbnail_URL = channel_details.get('Thumbnail_URL'),
+            Exported_At = Exported_At
+        ))
+
+        for playlist in document.get('PlaylistDetails', []):
+            Add_Row('playlists', dict(
+                Playlist_Id = playlist.get('Playlist_Id'),
+                Channel_Id = channel_id,
+                Playlist_Name = playlist.get('Playlist_Name')
+            ))
+
+        for video in Video_Records_From_Document(document):
+            Add_Row('videos', dict(
+                Video_Id = video.Video_Id,
+                Channel_Id = channel_id,
+                Playlist_Id = video.Playlist_ID,
+                Video_Name = video.Video_Name,
+                Video_Description = video.Video_Description,
+                Tags = video.Tags,
+                Published_At = video.PublishedAt,
+                View_Count = video.View_Count,
+                Like_Count = video.Like_Count,
+                Dislike_Count = video.Dislike_Count,
+                Favorite_Count = video.Favorite_Count,
+                Comment_Count = video.Comment_Count,
+                Duration_Seconds = video.Duration,
+                Thumbnail = video.Thumbnail,
+                Caption_Status = video.Caption_Status,
+                Publish_Month = video.PublishedAt.strftime('%Y-%m') if video.PublishedAt else 'unknown'
+            ))
+
+            for comment in video.Comments:
+                Add_Row('comments', dict(
+                    Comment_Id = comment.Comment_Id,
+                    Video_Id = video.Video_Id,
+                    Channel_Id = channel_id,
+                    Comment_Text = comment.Comment_Text,
+                    Comment_Author = comment.Comment_Author,
+                    Comment_Published_At = comment.Comment_PublishedAt,
+                    Publish_Month = comment.Comment_PublishedAt.strftime('%Y-%m') if comment.Comment_PublishedAt else 'unknown'
+                ))
+
+    for table in Schemas:
+        Flush(table)
+    return Exported
+
+
 #___________________________SQL Queries to display the answer to question___________________________#
 def Question_1():
+    import pandas as pd
+
     connection = connect_to_mysql()
     cursor = connection.cursor()
     query = """
@@ -584,6 +2359,8 @@ def Question_1():
 
 
 def Question_2():
+    import pandas as pd
+
     connection = connect_to_mysql()
     cursor = connection.cursor()
     query = """
@@ -600,6 +2377,8 @@ def Question_2():
 
 
 def Question_3(Input_Top):
+    import pandas as pd
+
     connection = connect_to_mysql()
     cursor = connection.cursor()
     query = f"""
@@ -616,6 +2395,8 @@ def Question_3(Input_Top):
 
 
 def Question_4():
+    import pandas as pd
+
     connection = connect_to_mysql()
     cursor = connection.cursor()
     query = """
@@ -632,6 +2413,8 @@ def Question_4():
 
 
 def Question_5():
+    import pandas as pd
+
     connection = connect_to_mysql()
     cursor = connection.cursor()
     query = """
@@ -647,6 +2430,8 @@ def Question_5():
 
 
 def Question_6():
+    import pandas as pd
+
     connection = connect_to_mysql()
     cursor = connection.cursor()
     query = """
@@ -663,6 +2448,8 @@ def Question_6():
     
 
 def Question_7():
+    import pandas as pd
+
     connection = connect_to_mysql()
     cursor = connection.cursor()
     query = """
@@ -678,6 +2465,8 @@ def Question_7():
 
 
 def Question_8(Input_Year):
+    import pandas as pd
+
     connection = connect_to_mysql()
     cursor = connection.cursor()
     query = f"""
@@ -694,6 +2483,8 @@ def Question_8(Input_Year):
 
 
 def Question_9():
+    import pandas as pd
+
     connection = connect_to_mysql()
     cursor = connection.cursor()
     query = """
@@ -711,6 +2502,8 @@ def Question_9():
 
 
 def Question_10():
+    import pandas as pd
+
     connection = connect_to_mysql()
     cursor = connection.cursor()
     query = """
@@ -726,6 +2519,73 @@ def Question_10():
     return df
 
 
+#___________________________Full-Text Search___________________________#
+# FULLTEXT indexes used by Search_Warehouse (also created in Youtube_Harvesting.sql)
+Fulltext_Indexes = {
+    ('video', 'ft_video_name_description'): 'video_name, video_description',
+    ('comment', 'ft_comment_text'): 'comment_text'
+}
+
+
+def Ensure_Fulltext_Indexes(connection):
+    """
+    Create the FULLTEXT indexes on the video and comment tables when the database was created
+    before they were added to Youtube_Harvesting.sql.
+    
+    """
+    cursor = connection.cursor()
+    cursor.execute("""SELECT DISTINCT table_name, index_name FROM information_schema.statistics
+                      WHERE table_schema = DATABASE() AND index_type = 'FULLTEXT'""")
+    Existing = {(table.lower(), index) for table, index in cursor.fetchall()}
+    for (table, index), columns in Fulltext_Indexes.items():
+        if (table, index) not in Existing:
+            st.write(f'Creating full-text index on the "{table}" table...')
+            cursor.execute(f"ALTER TABLE {table} ADD FULLTEXT INDEX {index} ({columns})")
+    cursor.close()
+
+
+def Search_Warehouse(Search_Text, Scope='All', Page=1, Page_Size=20, Boolean_Mode=False):
+    """
+    Search the video titles, video descriptions and comments with the MySQL FULLTEXT indexes.
+    Boolean mode accepts the MySQL operators (+word -word "phrase" word*).
+
+    Returns:
+    - DataFrame of the requested page of results, ranked by relevance
+    - Total number of matching videos and comments
+    """
+    import pandas as pd
+
+    Mode = 'IN BOOLEAN MODE' if Boolean_Mode else 'IN NATURAL LANGUAGE MODE'
+    Video_Query = f"""
+    select 'Video' As 'Type', C.channel_name As 'Channel Name', V.video_name As 'Video Name', V.video_id As 'Video Id',
+    left(V.video_description, 300) As 'Text', match(V.video_name, V.video_description) against (%s {Mode}) As 'Score'
+    from video V left join Channel C on V.playlist_id = C.channel_id
+    where match(V.video_name, V.video_description) against (%s {Mode})
+    """
+    Comment_Query = f"""
+    select 'Comment' As 'Type', C.channel_name As 'Channel Name', V.video_name As 'Video Name', CM.video_id As 'Video Id',
+    CM.comment_text As 'Text', match(CM.comment_text) against (%s {Mode}) As 'Score'
+    from comment CM left join video V on CM.video_id = V.video_id left join Channel C on V.playlist_id = C.channel_id
+    where match(CM.comment_text) against (%s {Mode})
+    """
+    Queries = {'All': [Video_Query, Comment_Query], 'Videos': [Video_Query], 'Comments': [Comment_Query]}[Scope]
+    Union = ' union all '.join(f'({query})' for query in Queries)
+    Parameters = [Search_Text] * (2 * len(Queries))
+
+    connection = connect_to_mysql()
+    cursor = connection.cursor()
+    with Stage_Timer('search_query_seconds', scope=Scope):
+        cursor.execute(f"select count(*) from ({Union}) As results", Parameters)
+        Total = cursor.fetchone()[0]
+        cursor.execute(f"select * from ({Union}) As results order by Score desc limit %s offset %s",
+                       Parameters + [Page_Size, (Page - 1) * Page_Size])
+        records = cursor.fetchall()
+    df = pd.DataFrame(records, columns=['Type', 'Channel Name', 'Video Name', 'Video Id', 'Text', 'Score'])
+    cursor.close()
+    connection.close()
+    return df, Total
+
+
 #___________________________Sidebar Configuration___________________________#
 def display_sidebar():
     with st.sidebar:
@@ -733,8 +2593,8 @@ def display_sidebar():
         st.image(image_url, use_column_width=True)
 
         selected = option_menu(menu_title='', options=['Home','Data Scraping', 'Data Migration',
-                                                 'SQL Queries'],
-                         icons=['house-door-fill','youtube', 'database-add',  'pencil-square'],
+                                                 'SQL Queries', 'Search'],
+                         icons=['house-door-fill','youtube', 'database-add',  'pencil-square', 'search'],
                          default_index=0,
                          orientation = "vertical",
                          styles={"nav-link": {"font-size": "14px", "text-align": "centre", "margin": "10px", 
@@ -742,7 +2602,8 @@ def display_sidebar():
                                    "icon": {"font-size": "14px"},
                                    "container" : {"max-width": "6000px"},
                                    "nav-link-selected": {"background-color": "#015ec8"}})
-    return selected
+        Profile_Run = st.checkbox('Profile the next run', help="Profile the next scrape/migration run with cProfile; stats are saved under the profiles folder")
+    return selected, Profile_Run
 
 
 # Call functions
@@ -755,7 +2616,11 @@ def init_session():
     return {'button_clicked':False}
 
 
-selected = display_sidebar()
+# The pages are only rendered by "streamlit run"; importing the module (e.g. from Benchmark_Harvesting.py) only loads the functions
+selected, Profile_Run = display_sidebar() if __name__ == "__main__" else (None, False)
+
+if selected and os.environ.get('YT_METRICS_PORT'):
+    Start_Metrics_Server(int(os.environ['YT_METRICS_PORT']))
 
 if selected == "Home":
     
@@ -796,14 +2661,15 @@ elif selected == 'Data Scraping':
 
     try:
         global Channel_Ids
-        API_Key = st.text_input("Enter Your API Key:", type='password', help="Your YouTube Data API v3 key")
-        Channel_Ids = st.text_input("Enter the Channel ID(s): ", help="Enter one or more YouTube Channel IDs separated by commas")
-        st.write('<span style="color:red; font-size: 13px;">Note: You can enter multiple Channel IDs separated by commas.</span>', unsafe_allow_html=True)
+        API_Key = st.text_input("Enter Your API Key:", type='password', help="Your YouTube Data API v3 key, or several keys separated by commas to use the quota of all of them")
+        Channel_Ids = st.text_input("Enter the Channel ID(s): ", help="Enter one or more YouTube Channel IDs, @handles or channel URLs separated by commas")
+        st.write('<span style="color:red; font-size: 13px;">Note: You can enter multiple Channel IDs, @handles or channel URLs separated by commas.</span>', unsafe_allow_html=True)
 
         if st.button("Scrape Data"):
             if API_Key or Channel_Ids:    
                 Channels_Id_List = [channel_id.strip() for channel_id in Channel_Ids.split(',')]
-                Youtube = API_Connection(API_Key)
+                API_Keys = tuple(dict.fromkeys(key.strip() for key in API_Key.split(',') if key.strip())) or (API_Key,)
+                Youtube = API_Connection(API_Keys[0]) if len(API_Keys) == 1 else API_Key_Pool_Connection(API_Keys)
                 _Unique = []
                 _Duplicate = []
                 
@@ -815,10 +2681,21 @@ elif selected == 'Data Scraping':
                 if len(_Duplicate)>=1:
                     st.warning(f'Out of {len(Channels_Id_List)} Channel Id(s) you have entered {len(_Duplicate)} duplicate Channel Id(s): ' + ", ".join(_Duplicate))
 
+                # Each scrape is a new harvest run with its own temporary data
+                Run_Id = st.session_state['Run_Id'] = New_Run_Id()
+                st.write(f'Harvest run: {Run_Id} (start "python Harvest_Worker.py --run-id {Run_Id}" on other machines to share the work)')
                 with st.spinner('Please wait while channels are being scraped...'):
-                    Clear_TempDB_In_MongoDB()
-                    Main_Scraping(Youtube,_Unique,Channels_Id_List)
-                    Channel_Scraping(_Unique)
+                    Start_Run('scraping', Profile=Profile_Run)
+                    try:
+                        # One worker thread per API key
+                        Scraped_Channel_Ids = Main_Scraping(Youtube,_Unique,Channels_Id_List,Workers=len(API_Keys),Run_Id=Run_Id)
+                    finally:
+                        Report = Finish_Run()
+                    Channel_Scraping(Scraped_Channel_Ids, Run_Id)
+                    Display_Run_Report(Report)
+                    if isinstance(Youtube, API_Key_Pool):
+                        st.write('API quota used today per key')
+                        st.dataframe(Youtube.Usage())
             else:
                 st.warning("Please provide the **API Key** & **Channel ID/s**.")
 
@@ -831,30 +2708,68 @@ elif selected == 'Data Migration':
     session_state = st.session_state
     if 'button_clicked' not in session_state:
         session_state.update(init_session())
+
+    Run_Ids = Temp_Run_Ids()
+    Run_Id = st.selectbox("Harvest run: ", Run_Ids, index=Run_Ids.index(session_state['Run_Id']) if session_state.get('Run_Id') in Run_Ids else 0,
+                          help="Scraped data waiting in the Temporary DB, latest run first") if Run_Ids else None
     
     st.write("""<span style="color: #DAA520;">Click here to insert/update the scraped data into MongoDB</span>""",unsafe_allow_html = True)
 
     if st.button("Upload to MongoDB"):
         session_state['button_clicked'] = True
         with st.spinner('Data Uploading to MongoDB started...'):
-            Move_from_tempdb_to_mongodb()
+            Start_Run('mongodb_upload', Profile=Profile_Run)
+            Move_from_tempdb_to_mongodb(Run_Id)
+        Display_Run_Report(Finish_Run())
 
     st.write("")
     st.write("")
     st.write("""<span style="color: #DAA520;">Click here to insert/update the document from MongoDB to MySQL</span>""",unsafe_allow_html = True)
+    MySQL_Workers = st.number_input("MySQL connections: ", min_value=1, max_value=32, value=4, help="Number of channels migrated in parallel, each on its own MySQL connection")
     if st.button("Upload to mysql"):
         if not session_state['button_clicked']:
             st.warning('First upload the data into mongodb then try uploading into mysql')
         else:
             with st.spinner('Data Migrating to mysql started...'):
-                Channel_Ids_In_TempDB = Channel_Namelist_In_TempDB_In_MongoDB()
+                Channel_Ids_In_TempDB = Channel_Namelist_In_TempDB_In_MongoDB(Run_Id)
                 collection = Connect_To_MongoDB()
-                for channels in Channel_Ids_In_TempDB:
-                    insert_or_update_mysql(collection,channels)
-                Clear_TempDB_In_MongoDB()
+                Start_Run('mysql_migration', Profile=Profile_Run)
+                try:
+                    mysql_connection = connect_to_mysql()
+                    Ensure_Fulltext_Indexes(mysql_connection)
+                    Ensure_Snapshot_Table(mysql_connection)
+                    Maintain_Snapshot_Partitions(mysql_connection, Snapshot_Retention_Days)
+                    mysql_connection.close()
+                except Exception as e:
+                    st.error(f"An error occurred while preparing the MySQL tables: {e}")
+                Failed = Migrate_Channels_To_MySQL(collection, Channel_Ids_In_TempDB, int(MySQL_Workers), Run_Id)
+                for channel_id, error in Failed.items():
+                    st.error(f'An error occurred while migrating the channel {channel_id}: {error}')
+                if not Failed and Run_Id:
+                    Clear_TempDB_In_MongoDB(Run_Id)
+                try:
+                    mysql_connection = connect_to_mysql()
+                    Downsample_Statistics_Snapshots(mysql_connection, Retention_Days=Snapshot_Retention_Days)
+                    mysql_connection.close()
+                except Exception as e:
+                    st.error(f"An error occurred while downsampling the statistics snapshots: {e}")
+            Display_Run_Report(Finish_Run())
+
+    st.write("")
+    st.write("")
+    st.write("""<span style="color: #DAA520;">Click here to export the documents from MongoDB to Parquet files</span>""",unsafe_allow_html = True)
+    Export_Dir = st.text_input("Export Directory: ", value="parquet_export", help="Folder where the partitioned Parquet files are written")
+    if st.button("Export to Parquet"):
+        with st.spinner('Data Exporting to Parquet started...'):
+            try:
+                Exported = Export_To_Parquet(Export_Dir)
+                st.success('Successfully exported ' + ", ".join(f'{count} {table}' for table, count in Exported.items()) + f' into "{Export_Dir}"')
+            except Exception as e:
+                st.error(f"An error occurred while exporting to Parquet: {e}")
 
 
 elif selected == 'SQL Queries':
+    import plotly.express as px
     
     st.write("## :orange[Select any question to get Insights]")
     questions = st.selectbox('Questions',
@@ -868,7 +2783,8 @@ elif selected == 'SQL Queries':
     '7. What is the total number of views for each channel, and what are their corresponding channel names?',
     '8. What are the names of all the channels that have published videos in below year?',
     '9. What is the average duration of all videos in each channel, and what are their corresponding channel names?',
-    '10. Which videos have the highest number of comments, and what are their corresponding channel names?'])
+    '10. Which videos have the highest number of comments, and what are their corresponding channel names?',
+    '11. Which videos gained the most views in the below number of days?'])
 
     if questions == '--Select your questions--':
         pass
@@ -990,4 +2906,46 @@ elif selected == 'SQL Queries':
 
             Chart = px.bar(df_Question10, x = 'Video Name', y = 'Comment Count', color = 'Channel Name', title = 'Videos with highest number of comments by Channel')
             st.plotly_chart(Chart)
-        
+
+    elif questions == '11. Which videos gained the most views in the below number of days?':
+        with st.spinner('Kindly await while we retrieve the outcome'):
+            try:
+                Input_Days = st.text_input("Enter the number of days: ", value="30", help="Enter in numbers")
+                if Input_Days:
+                    df_Question11 = Video_Growth_Rates(int(Input_Days))
+                    df_Question11.index += 1
+                    df_Question11.index.name = 'S No.'
+                    st.dataframe(df_Question11)
+                    chart = px.bar(df_Question11, x='Views Per Day', y='Video Name', color='Channel Name',
+                             title=f'Views Gained Per Day in the Last {Input_Days} Days',
+                             orientation='h')
+                    st.plotly_chart(chart)
+            except ValueError:
+                st.warning('Enter the number of days in numbers')
+
+
+elif selected == 'Search':
+
+    st.write("## :orange[Search videos and comments]")
+    Search_Text = st.text_input("Search: ", help="Words to look for in the video titles, descriptions and comments")
+    Scope_Column, Mode_Column, Page_Column = st.columns(3)
+    Scope = Scope_Column.selectbox('Search in', ['All', 'Videos', 'Comments'])
+    Boolean_Mode = Mode_Column.checkbox('Boolean mode', help='Use +word, -word, "exact phrase" and word* operators')
+    Page = Page_Column.number_input('Page', min_value=1, value=1, step=1)
+
+    if Search_Text:
+        with st.spinner('Kindly await while we retrieve the outcome'):
+            try:
+                df_Search, Total = Search_Warehouse(Search_Text, Scope, int(Page), 20, Boolean_Mode)
+                if Total:
+                    df_Search.index += (int(Page) - 1) * 20 + 1
+                    df_Search.index.name = 'S No.'
+                    st.write(f'Showing {df_Search.index.min() if len(df_Search) else 0} - {df_Search.index.max() if len(df_Search) else 0} of {Total} results')
+                    st.dataframe(df_Search)
+                else:
+                    st.info('No videos or comments match the search')
+            except Exception as e:
+                st.error(f"An error occurred while searching: {e}")
+
+if selected:
+    Record_Timing('streamlit_script_run_seconds', time.perf_counter() - Script_Start, page=selected)
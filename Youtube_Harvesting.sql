@@ -52,3 +52,28 @@ create table comment(
     comment_published_date datetime,
     foreign key (video_id) references video(video_id)
 );
+
+
+-- Create full-text indexes used by the Search page
+alter table video add fulltext index ft_video_name_description (video_name, video_description);
+
+alter table comment add fulltext index ft_comment_text (comment_text);
+
+
+-- Create a table as video_statistics_snapshot under database youtubescrapingsql
+-- One row per video and refresh when its statistics changed, partitioned by year
+-- Each migration splits the coming year out of pmax and, with YT_SNAPSHOT_RETENTION_DAYS, drops the expired years
+create table video_statistics_snapshot(
+	video_id varchar(64),
+    snapshot_time datetime,
+    view_count bigint,
+    like_count bigint,
+    comment_count bigint,
+    primary key (video_id, snapshot_time)
+)
+partition by range (year(snapshot_time)) (
+    partition p2024 values less than (2025),
+    partition p2025 values less than (2026),
+    partition p2026 values less than (2027),
+    partition pmax values less than maxvalue
+);
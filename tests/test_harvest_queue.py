@@ -0,0 +1,76 @@
+import os
+import sys
+
+import pytest
+
+mongomock = pytest.importorskip('mongomock')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Benchmark_Harvesting as Benchmark
+import YouTube_Data_Harvesting as Harvesting
+
+
+def Mongomock_Bulk_Write(self, Operations, ordered=True):
+    # mongomock does not accept the sort argument pymongo >= 4.9 passes to its bulk builder
+    from pymongo import ReplaceOne
+
+    for operation in Operations:
+        if isinstance(operation, ReplaceOne):
+            self.replace_one(operation._filter, operation._doc, upsert=operation._upsert)
+        else:
+            self.update_one(operation._filter, operation._doc, upsert=operation._upsert)
+
+
+@pytest.fixture
+def Youtube(monkeypatch):
+    Client = mongomock.MongoClient()
+    monkeypatch.setenv('YT_API_CACHE_MB', '0')
+    monkeypatch.setattr(Harvesting, 'Mongo_Client', lambda: Client)
+    monkeypatch.setattr(mongomock.collection.Collection, 'bulk_write', Mongomock_Bulk_Write)
+    Youtube = Benchmark.FakeYouTube(Channels=1, Videos_Per_Channel=120, Comments_Per_Video=1, Playlists_Per_Channel=1)
+    Resolved, _ = Harvesting.Resolve_Channels(Youtube, Youtube.Channel_Ids)
+    Harvesting.Enqueue_Channels(Resolved.values(), 'test_run')
+    return Youtube
+
+
+def Scraped_Videos(Channel_Id):
+    Document = Harvesting.Connect_To_TempdbMongoDB('test_run').find_one({'ChannelDetails.Channel_Id': Channel_Id})
+    return len(Document['VideoDetails'])
+
+
+def Tasks(Task_Type):
+    return list(Harvesting.Harvest_Task_Collection().find({'Run_Id': 'test_run', 'Type': Task_Type}))
+
+
+def test_duplicate_batch_keeps_the_assembled_channel(Youtube):
+    Harvesting.Run_Harvest_Worker(Youtube, 'test_run', Poll_Seconds=0)
+    Channel_Id = Youtube.Channel_Ids[0]
+    assert Scraped_Videos(Channel_Id) == 120
+
+    # The first batch is run again, as by a worker whose lease expired after it had finished
+    Batch = Harvesting.Harvest_Task_Collection().find_one({'Run_Id': 'test_run', 'Type': 'videos', 'Batch': 0})
+    Harvesting.Run_Videos_Task(Youtube, Batch)
+    Harvesting.Run_Harvest_Worker(Youtube, 'test_run', Poll_Seconds=0)
+
+    assert [task['Status'] for task in Tasks('assemble')] == ['done']
+    assert Scraped_Videos(Channel_Id) == 120
+
+
+def test_expired_lease_is_claimed_again(Youtube):
+    Channel = Harvesting.Claim_Task('first', 'test_run')
+    Harvesting.Run_Channel_Task(Youtube, Channel)
+    Harvesting.Finish_Task(Channel, 'first')
+    # A worker claims a batch and stalls, its lease expires at once
+    Stalled = Harvesting.Claim_Task('stalled', 'test_run', Lease_Seconds=0)
+    assert Stalled['Type'] == 'videos'
+
+    # Three batches, the stalled one included, and the assemble task
+    assert Harvesting.Run_Harvest_Worker(Youtube, 'test_run', Worker_Id='other', Poll_Seconds=0) == 4
+    # The stalled worker finishes late: its batch is not counted twice and its lease is gone
+    Harvesting.Run_Videos_Task(Youtube, Stalled)
+    Harvesting.Finish_Task(Stalled, 'stalled')
+
+    assert all(task['Status'] == 'done' and task['Owner'] != 'stalled' for task in Tasks('videos'))
+    assert len(Tasks('assemble')) == 1
+    assert Scraped_Videos(Youtube.Channel_Ids[0]) == 120